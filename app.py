@@ -1,7 +1,13 @@
-import subprocess
+import queue
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 import json
+from job_manager import JobManager, ScrapeJob
+
+# Scrapes running at the same time; further jobs wait in the queue
+MAX_CONCURRENT_JOBS = 2
+# How often the GUI drains output from the job workers
+POLL_INTERVAL_MS = 100
 
 def load_categories():
     with open('subcategory_mapper.json', 'r', encoding='utf-8') as f:
@@ -9,18 +15,45 @@ def load_categories():
     return data['categories']
 
 def run_data_scraper(category_path, marketplace, browser):
-    process = subprocess.Popen(['python', 'data_scraper.py', category_path[0], marketplace, browser] + category_path[1:], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    for line in process.stdout:
-        output_text.insert(tk.END, line)
-        output_text.see(tk.END)
-        root.update_idletasks()
-    for line in process.stderr:
-        output_text.insert(tk.END, "\nError: " + line)
+    job = job_manager.submit(ScrapeJob(category_path, marketplace, browser))
+    job_tree.insert('', 'end', iid=str(job.job_id), values=job_row(job))
+
+def job_row(job):
+    progress = f"{job.products_done}/{job.products_total}" if job.products_total else str(job.products_done)
+    return (job.job_id, job.label, job.status, progress, f"{job.products_per_minute():.1f}")
+
+def poll_jobs():
+    # Worker threads only fill the queue; all widget updates happen here on the Tk thread
+    changed = set()
+    try:
+        for _ in range(500):
+            job_id, kind, payload = job_manager.events.get_nowait()
+            job = job_manager.jobs[job_id]
+            if kind == 'output':
+                job.update_progress(payload)
+                output_text.insert(tk.END, f"[{job_id}] {payload}")
+            else:
+                output_text.insert(tk.END, f"[{job_id}] {job.label}: {payload}\n")
+            changed.add(job_id)
+    except queue.Empty:
+        pass
+    if changed:
         output_text.see(tk.END)
-        root.update_idletasks()
+    # Rates move even without new output
+    for job in job_manager.jobs.values():
+        if job.job_id in changed or job.finished_at is None:
+            job_tree.item(str(job.job_id), values=job_row(job))
+    root.after(POLL_INTERVAL_MS, poll_jobs)
+
+def on_cancel_button_click():
+    for item in job_tree.selection():
+        job_manager.cancel(int(item))
+
+def on_close():
+    job_manager.cancel_all()
+    root.destroy()
 
 def on_run_button_click():
-    output_text.delete(1.0, tk.END)
     selected_item = category_tree.selection()
     if selected_item:
         category_path = []
@@ -34,6 +67,7 @@ def on_run_button_click():
 
 # Load categories from subcategory_mapper.json
 categories = load_categories()
+job_manager = JobManager(MAX_CONCURRENT_JOBS)
 
 # Create the main window
 root = tk.Tk()
@@ -74,9 +108,23 @@ browser_dropdown.pack(pady=5)
 run_button = tk.Button(root, text="Veri Çekmeye Başla", command=on_run_button_click)
 run_button.pack(pady=10)
 
+# Create a list of queued, running and finished jobs with their progress
+job_columns = {'id': "#", 'job': "İş", 'status': "Durum", 'progress': "Ürün", 'rate': "Ürün/dk"}
+job_tree = ttk.Treeview(root, columns=list(job_columns), show='headings', height=5)
+for column, heading in job_columns.items():
+    job_tree.heading(column, text=heading)
+    job_tree.column(column, width=320 if column == 'job' else 80, stretch=column == 'job')
+job_tree.pack(pady=5, fill=tk.X)
+
+# Create a button to cancel the selected jobs
+cancel_button = tk.Button(root, text="Seçili İşi İptal Et", command=on_cancel_button_click)
+cancel_button.pack(pady=5)
+
 # Create a scrolled text widget to display the output
 output_text = scrolledtext.ScrolledText(root, width=80, height=20)
 output_text.pack(pady=10)
 
-# Start the Tkinter event loop
+# Start polling job output and the Tkinter event loop
+root.protocol("WM_DELETE_WINDOW", on_close)
+root.after(POLL_INTERVAL_MS, poll_jobs)
 root.mainloop()
\ No newline at end of file
@@ -0,0 +1,140 @@
+from typing import Callable, Dict, List, Optional
+from selenium.webdriver.remote.webdriver import WebDriver
+from selector_plan import SelectorPlan
+
+# Runs inside the page. Tries every field's XPaths in plan order (fallbacks
+# included), walks the description tabs and hands one dict back to Python.
+# Selenium appends the async callback as the last argument.
+EXTRACTION_SCRIPT = """
+const fieldXpaths = arguments[0];
+const tabs = arguments[1];
+const tabTimeoutMs = arguments[2];
+const budgetMs = arguments[3];
+const done = arguments[arguments.length - 1];
+const started = Date.now();
+
+function all(xpath) {
+    const result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+    return nodes;
+}
+function first(field) {
+    if (!(field in fieldXpaths)) return undefined;
+    for (const xpath of fieldXpaths[field]) {
+        const node = all(xpath)[0];
+        if (node) return node;
+    }
+    return null;
+}
+// Time spent looking up each field in the page, fallbacks included
+const lookupMs = {};
+function timedFirst(field) {
+    const lookupStarted = performance.now();
+    const node = first(field);
+    if (node !== undefined) lookupMs[field] = performance.now() - lookupStarted;
+    return node;
+}
+function text(node) {
+    return (node.innerText || node.textContent || '').trim();
+}
+function descriptionText() {
+    return all(tabs.description).map(text).filter(Boolean).join(' ');
+}
+
+const missing = [];
+const image = timedFirst('image');
+const name = timedFirst('product_name');
+const brand = timedFirst('brand');
+const price = timedFirst('current_price');
+const oldPrice = timedFirst('old_price');
+if (!image) missing.push('image');
+if (!name) missing.push('product_name');
+if (brand === null) missing.push('brand');
+if (!price) missing.push('current_price');
+
+const fields = {
+    image: image ? image.getAttribute('src') : null,
+    product_name: name ? text(name) : null,
+    brand: brand ? text(brand) : '-',
+    current_price: price ? text(price) : null,
+    old_price: oldPrice ? text(oldPrice) : '-',
+    url: window.location.href,
+    descriptions: null,
+    missing: missing,
+    lookup_ms: lookupMs
+};
+
+if (missing.length || !tabs) {
+    done(fields);
+} else {
+    const tabElements = all(tabs.tabs);
+    const descriptions = [];
+    let previous = null;
+    const next = (index) => {
+        if (index >= tabElements.length) {
+            fields.descriptions = descriptions;
+            done(fields);
+            return;
+        }
+        const tab = tabElements[index];
+        tab.scrollIntoView(true);
+        tab.click();
+        const clicked = Date.now();
+        const poll = () => {
+            const content = descriptionText();
+            const ready = content !== '' && content !== previous;
+            const expired = Date.now() - clicked >= tabTimeoutMs || Date.now() - started >= budgetMs;
+            if (ready || expired) {
+                previous = content;
+                descriptions.push({'Tab Index': index, 'Tab Name': text(tab) || '-', 'Content': content});
+                next(index + 1);
+            } else {
+                setTimeout(poll, 50);
+            }
+        };
+        poll();
+    };
+    next(0);
+}
+"""
+
+# Stay under Selenium's default 30 s script timeout no matter how many tabs there are
+SCRIPT_BUDGET_MS = 25000
+
+
+class MissingElementsError(Exception):
+    """Required selectors matched nothing on the product page."""
+
+    def __init__(self, missing: List[str]):
+        super().__init__(f"No element found for: {', '.join(missing)}")
+        self.missing = missing
+
+
+class BatchExtractor:
+    """Extracts a product page in a single WebDriver round trip.
+
+    The market's selector plan is shipped to the browser once per page as
+    script arguments, instead of one ``find_element`` plus one ``.text`` call
+    per field.
+    """
+
+    def __init__(self, plan: SelectorPlan, tab_timeout: float = 5):
+        self.field_xpaths = plan.field_xpaths()
+        self.tabs = ({'tabs': plan.description_tabs, 'description': plan.description}
+                     if plan.description_tabs else None)
+        self.tab_timeout_ms = int(tab_timeout * 1000)
+
+    def extract_fields(self, driver: WebDriver,
+                       observe_lookup: Optional[Callable[[str, float], None]] = None) -> Dict[str, object]:
+        """Run the extraction script; ``observe_lookup(field, seconds)`` gets each field's in-page lookup time."""
+        fields = driver.execute_async_script(EXTRACTION_SCRIPT, self.field_xpaths, self.tabs, self.tab_timeout_ms,
+                                             SCRIPT_BUDGET_MS)
+        lookup_ms = fields.pop('lookup_ms')
+        if observe_lookup is not None:
+            for field, milliseconds in lookup_ms.items():
+                observe_lookup(field, milliseconds / 1000)
+        missing = fields.pop('missing')
+        if missing:
+            raise MissingElementsError(missing)
+        return fields
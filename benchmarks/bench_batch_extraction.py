@@ -0,0 +1,83 @@
+"""Micro-benchmark: element-by-element vs single round trip product extraction.
+
+Loads each product URL once, then runs ``extract_element_info`` repeatedly in
+both modes against the same rendered page, counting WebDriver commands.
+
+Usage:
+    python benchmarks/bench_batch_extraction.py <marketplace> <browser> <product_url> [...] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_extractor import BatchExtractor  # noqa: E402
+from data_scraper import WebScraper, load_config  # noqa: E402
+from result_sink import MemorySink  # noqa: E402
+
+
+class CommandCounter:
+    """Wraps ``driver.execute`` so every WebDriver HTTP round trip is counted."""
+
+    def __init__(self, driver):
+        self.count = 0
+        self._execute = driver.execute
+        driver.execute = self._counting_execute
+
+    def _counting_execute(self, *args, **kwargs):
+        self.count += 1
+        return self._execute(*args, **kwargs)
+
+
+def run_mode(scraper, counter, extractor, repeat):
+    scraper.batch_extractor = extractor
+    scraper.sink = MemorySink()
+    timings, round_trips = [], []
+    for _ in range(repeat):
+        counter.count = 0
+        started = time.perf_counter()
+        scraper.extract_element_info('benchmark')
+        timings.append(time.perf_counter() - started)
+        round_trips.append(counter.count)
+    return timings, round_trips, scraper.sink.rows_written
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('marketplace')
+    parser.add_argument('browser')
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    config = load_config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      f'{args.marketplace}_config.json'))
+    scraper = WebScraper(config, {'categories': {}}, args.browser.lower(), headless=True)
+    batch = BatchExtractor(scraper.plan, tab_timeout=config.timeout('description_tab'))
+    try:
+        counter = CommandCounter(scraper.driver)
+        results = {'elements': ([], [], 0), 'batch': ([], [], 0)}
+        for url in args.urls:
+            scraper.driver.get(url)
+            scraper._wait_for_product(scraper.driver)
+            for mode, extractor in (('elements', None), ('batch', batch)):
+                timings, round_trips, rows = run_mode(scraper, counter, extractor, args.repeat)
+                results[mode][0].extend(timings)
+                results[mode][1].extend(round_trips)
+                results[mode] = (results[mode][0], results[mode][1], results[mode][2] + rows)
+
+        print(f"{'mode':<10} {'median ms':>10} {'p90 ms':>8} {'round trips':>12} {'rows':>6}")
+        for mode, (timings, round_trips, rows) in results.items():
+            timings = sorted(timings)
+            p90 = timings[int(len(timings) * 0.9) - 1] if len(timings) >= 10 else timings[-1]
+            print(f"{mode:<10} {statistics.median(timings) * 1000:>10.1f} {p90 * 1000:>8.1f} "
+                  f"{statistics.mean(round_trips):>12.1f} {rows:>6}")
+    finally:
+        scraper.session.quit()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,81 @@
+"""Benchmark: default browser vs the lean "browser_profile" from the market config.
+
+Loads the same URLs with each profile and reports pages per minute and the
+resident memory of the whole driver process tree (driver + browser processes).
+
+Usage:
+    python benchmarks/bench_browser_profile.py <marketplace> <browser> <url> [...] [--listing] [--rounds N]
+"""
+import argparse
+import dataclasses
+import os
+import sys
+import time
+
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_scraper import WebScraper, load_config  # noqa: E402
+
+
+def tree_rss(pid: int) -> int:
+    process = psutil.Process(pid)
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+def run_profile(config, browser, urls, listing, rounds):
+    scraper = WebScraper(config, {'categories': {}}, browser)
+    try:
+        started = time.perf_counter()
+        driver = scraper.driver
+        startup = time.perf_counter() - started
+        peak_rss = 0
+        loaded = 0
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for url in urls:
+                driver.get(url)
+                if listing:
+                    scraper._wait_for_listing(driver)
+                else:
+                    scraper._wait_for_product(driver)
+                loaded += 1
+                peak_rss = max(peak_rss, tree_rss(scraper.driver.service.process.pid))
+        elapsed = time.perf_counter() - started
+        return startup, loaded / elapsed * 60, peak_rss
+    finally:
+        scraper.session.quit()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('marketplace')
+    parser.add_argument('browser')
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--listing', action='store_true', help="URLs are listing pages, not product pages")
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    config = load_config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      f'{args.marketplace}_config.json'))
+    # The baseline keeps everything the old _initialize_driver loaded, only headless so both runs render the same way
+    profiles = {
+        'default': dataclasses.replace(config, browser_profile={'headless': True}),
+        'lean': config,
+    }
+    print(f"{'profile':<8} {'startup s':>10} {'pages/min':>10} {'peak RSS MB':>12}")
+    for name, profile_config in profiles.items():
+        startup, pages_per_minute, peak_rss = run_profile(profile_config, args.browser.lower(), args.urls,
+                                                          args.listing, args.rounds)
+        print(f"{name:<8} {startup:>10.1f} {pages_per_minute:>10.1f} {peak_rss / 2**20:>12.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,320 @@
+"""Offline replay benchmark: the real scraper against recorded listing and product pages.
+
+``record`` loads a category's listing pages and some of its product pages once
+(network needed) and stores the rendered HTML, with scripts and stylesheets
+removed and links made relative, under ``benchmarks/fixtures/<market>/``.
+``run`` serves those fixtures from a local HTTP stand-in and drives
+``WebScraper.scrape_category`` (and through it ``extract_element_info``) plus
+``text_splitter.transform`` against them, with no network at all, and reports
+pages per second, per-product latency percentiles and peak memory of the
+whole process tree (Python, driver and browser).
+
+Fixtures are static snapshots, so the description tab wait, which waits for
+the panel text to change, is capped at 0s during replay; every other timeout
+comes from the market config, as in a live run.
+
+Usage:
+    python benchmarks/bench_replay.py record <marketplace> <category> [--browser B] [--pages N] [--products N]
+    python benchmarks/bench_replay.py run [--markets m ...] [--browser B] [--workers N] [--extraction batch] [--repeat N]
+"""
+import argparse
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pandas as pd
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import text_splitter  # noqa: E402
+from data_scraper import WebScraper, load_category_mapper, load_config  # noqa: E402
+from pagination import page_url  # noqa: E402
+from result_sink import DeadLetterLog, MemorySink, RunCheckpoint  # noqa: E402
+
+DEFAULT_FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+MARKETS = ['migros', 'a101', 'sok']
+SCRIPT_PATTERN = re.compile(r'<script\b.*?</script\s*>', re.IGNORECASE | re.DOTALL)
+LINK_PATTERN = re.compile(r'<link\b[^>]*>', re.IGNORECASE)
+# Keeps the replayed page from fetching anything that is not on the stand-in
+OFFLINE_POLICY = ("<meta http-equiv=\"Content-Security-Policy\" "
+                  "content=\"default-src 'self' 'unsafe-inline' data:\">")
+
+
+def path_key(url):
+    parsed = urlparse(url)
+    return parsed.path + (f"?{parsed.query}" if parsed.query else '')
+
+
+class FixtureStore:
+    """Recorded pages of one market, keyed by path and query, gzipped on disk."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        manifest_path = os.path.join(directory, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as file:
+                self.manifest = json.load(file)
+        else:
+            self.manifest = {'category_path': None, 'listing_pages': 0, 'pages': {}}
+
+    def add(self, url, html, host):
+        html = SCRIPT_PATTERN.sub('', html)
+        html = LINK_PATTERN.sub('', html)
+        # Absolute links to the market become relative so they resolve against the stand-in
+        html = re.sub(r'((?:href|src)=["\'])https?://' + re.escape(host), r'\1', html)
+        html = re.sub(r'<head([^>]*)>', lambda match: f"<head{match.group(1)}>{OFFLINE_POLICY}", html, count=1)
+        key = path_key(url)
+        file_name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '.html.gz'
+        os.makedirs(self.directory, exist_ok=True)
+        with gzip.open(os.path.join(self.directory, file_name), 'wt', encoding='utf-8') as file:
+            file.write(html)
+        self.manifest['pages'][key] = file_name
+
+    def load(self, key):
+        file_name = self.manifest['pages'].get(key)
+        if file_name is None:
+            return None
+        with gzip.open(os.path.join(self.directory, file_name), 'rb') as file:
+            return file.read()
+
+    def save(self, category_url, listing_pages):
+        self.manifest['category_path'] = path_key(category_url)
+        self.manifest['listing_pages'] = listing_pages
+        with open(os.path.join(self.directory, 'manifest.json'), 'w', encoding='utf-8') as file:
+            json.dump(self.manifest, file, indent=2)
+
+
+class FixtureServer:
+    """Local HTTP stand-in for a market; unknown paths get an empty 404 page."""
+
+    def __init__(self, store):
+        # Pages are decompressed up front so serving does not show up in the timings
+        pages = {key: store.load(key) for key in store.manifest['pages']}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = pages.get(self.path)
+                self.send_response(200 if body is not None else 404)
+                body = body if body is not None else b'<html><body></body></html>'
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, key):
+        return f"http://127.0.0.1:{self.server.server_port}{key}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PeakMemory:
+    """Samples the RSS of this process and all of its children (driver, browsers)."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        process = psutil.Process(os.getpid())
+        while not self._stop.is_set():
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.NoSuchProcess:
+                    pass
+            self.peak = max(self.peak, total)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class ReplayScraper(WebScraper):
+    """Keeps rows in memory instead of result files and times every product.
+
+    Listing pages only link to recorded products and end at the last recorded
+    page, so nothing waits for a timeout on a page that was never stored.
+    """
+
+    def __init__(self, store, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+        self.product_seconds = []
+        self._timings_lock = threading.Lock()
+
+    def _collect_listing(self, session, base_url, page, expected_cards=None):
+        listing = super()._collect_listing(session, base_url, page, expected_cards)
+        listing.hrefs = [href for href in listing.hrefs if path_key(href) in self.store.manifest['pages']]
+        if page == 1:
+            listing.total_products = None
+            listing.total_pages = self.store.manifest['listing_pages']
+        if page >= self.store.manifest['listing_pages']:
+            listing.has_next = False
+        return listing
+
+    def _open_output(self, category_name, resume_state):
+        self.sink = MemorySink()
+
+    def _save_results(self, category_name):
+        pass
+
+    def _process_product(self, session, href, href_index, total, category_name):
+        started = time.perf_counter()
+        super()._process_product(session, href, href_index, total, category_name)
+        with self._timings_lock:
+            self.product_seconds.append(time.perf_counter() - started)
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def record(args):
+    config = load_config(os.path.join(ROOT, f'{args.marketplace}_config.json'))
+    category_mapper = load_category_mapper(os.path.join(ROOT, args.mapper))
+    category_url = category_mapper['categories'][args.category]['urls'][args.marketplace]
+    host = urlparse(category_url).netloc
+    store = FixtureStore(os.path.join(args.fixtures, args.marketplace))
+    scraper = WebScraper(config, category_mapper, args.browser, headless=True, metrics_dir=None)
+    page_param = config.pagination.get('page_param', 'sayfa')
+    recorded_pages = 0
+    try:
+        for page in range(1, args.pages + 1):
+            listing = scraper._collect_listing(scraper.session, category_url, page)
+            store.add(page_url(category_url, page, page_param), scraper.driver.page_source, host)
+            recorded_pages = page
+            print(f"Recorded listing page {page} with {len(listing.hrefs)} products")
+            for href in listing.hrefs[:args.products]:
+                scraper._load(href)
+                scraper._wait_for_product(scraper.driver)
+                store.add(href, scraper.driver.page_source, host)
+            if not listing.hrefs or listing.has_next is False:
+                break
+        store.save(category_url, recorded_pages)
+        print(f"{len(store.manifest['pages'])} pages stored in {store.directory}")
+    finally:
+        scraper.close()
+
+
+def replay(market, args):
+    store = FixtureStore(os.path.join(args.fixtures, market))
+    config = load_config(os.path.join(ROOT, f'{market}_config.json'))
+    config = dataclasses.replace(config, timeouts={**config.timeouts, 'description_tab': 0})
+    with FixtureServer(store) as server, tempfile.TemporaryDirectory() as work_directory:
+        # The fixture server is local, so the rate limiter would only measure itself
+        scraper = ReplayScraper(store, config, {'categories': {}}, args.browser, workers=args.workers, headless=True,
+                                extraction_mode=args.extraction, postprocess='subprocess', metrics_dir=None,
+                                rate_limit=0)
+        scraper.checkpoint = RunCheckpoint(os.path.join(work_directory, 'checkpoint.json'))
+        scraper.dead_letters = DeadLetterLog(os.path.join(work_directory, 'dead_letters.jsonl'))
+        category_data = {'urls': {market: server.url(store.manifest['category_path'])}}
+        try:
+            # Browser startup is reported by bench_browser_profile.py; keep it out of throughput
+            scraper.session.acquire()
+            with PeakMemory() as memory:
+                started = time.perf_counter()
+                scraper.scrape_category(category_data, 'replay')
+                scrape_seconds = time.perf_counter() - started
+                rows = scraper.sink.rows
+                started = time.perf_counter()
+                if rows:
+                    text_splitter.transform(pd.DataFrame(rows))
+                transform_seconds = time.perf_counter() - started
+        finally:
+            scraper.close()
+    page_loads = sum(scraper.metrics.counters.get('page_loads', {}).values())
+    return {
+        'pages': page_loads,
+        'pages_per_second': page_loads / scrape_seconds if scrape_seconds else 0.0,
+        'products': len(scraper.product_seconds),
+        'rows': len(rows),
+        'p50': percentile(scraper.product_seconds, 0.5),
+        'p90': percentile(scraper.product_seconds, 0.9),
+        'p99': percentile(scraper.product_seconds, 0.99),
+        'transform_rows_per_second': len(rows) / transform_seconds if rows and transform_seconds else 0.0,
+        'peak_rss_mb': memory.peak / 2**20,
+    }
+
+
+def run(args):
+    markets = [market for market in args.markets
+               if os.path.exists(os.path.join(args.fixtures, market, 'manifest.json'))]
+    if not markets:
+        print(f"No fixtures in {args.fixtures}; record some first.")
+        return
+    print(f"{'market':<8} {'pages':>6} {'pages/s':>8} {'products':>9} {'p50 s':>7} {'p90 s':>7} "
+          f"{'p99 s':>7} {'split rows/s':>13} {'peak RSS MB':>12}")
+    for market in markets:
+        results = [replay(market, args) for _ in range(args.repeat)]
+        # The median run by throughput is reported, so one noisy run does not decide a comparison
+        result = sorted(results, key=lambda item: item['pages_per_second'])[len(results) // 2]
+        print(f"{market:<8} {result['pages']:>6} {result['pages_per_second']:>8.2f} {result['products']:>9} "
+              f"{result['p50']:>7.2f} {result['p90']:>7.2f} {result['p99']:>7.2f} "
+              f"{result['transform_rows_per_second']:>13.0f} {result['peak_rss_mb']:>12.0f}")
+        if args.repeat > 1:
+            spread = statistics.pstdev(item['pages_per_second'] for item in results)
+            print(f"{'':<8} pages/s over {args.repeat} runs: ±{spread:.2f}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_command = commands.add_parser('record', help="Store a category's pages as fixtures (needs network)")
+    record_command.add_argument('marketplace')
+    record_command.add_argument('category')
+    record_command.add_argument('--browser', default='chrome')
+    record_command.add_argument('--mapper', default='category_mapper.json')
+    record_command.add_argument('--pages', type=int, default=2, help="Listing pages to record")
+    record_command.add_argument('--products', type=int, default=20, help="Product pages to record per listing page")
+    run_command = commands.add_parser('run', help="Replay the fixtures offline and report throughput")
+    run_command.add_argument('--markets', nargs='+', default=MARKETS)
+    run_command.add_argument('--browser', default='chrome')
+    run_command.add_argument('--workers', type=int, default=1)
+    run_command.add_argument('--extraction', choices=['elements', 'batch'], default='elements')
+    run_command.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
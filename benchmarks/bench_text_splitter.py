@@ -0,0 +1,165 @@
+"""Benchmark: vectorized text_splitter.transform against the original row-wise script.
+
+Builds a synthetic product file, runs both implementations on it, checks that
+they produce the same frame and prints the timings.
+
+Usage:
+    python benchmarks/bench_text_splitter.py [--rows 1000000] [--legacy-rows N]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import text_splitter  # noqa: E402
+
+BRANDS = ['Ülker', 'Pınar', 'Sütaş', 'Eti', 'Coca-Cola', 'Erikli', 'Migros', 'Torku']
+PRODUCTS = ['Süt', 'Ayran', 'Çikolata', 'Bisküvi', 'Gazlı İçecek', 'Su', 'Peynir', 'Yoğurt', 'Makarna']
+SIZES = ['1 L', '1,5 L', '500 g', '200gr', '330 ml', '2,5 kg', '750ml', '1 Kg', '']
+PACKS = ['', "6'lı", '12 li', '4lü', 'x 6', '24 Lu']
+TABS = ['Ürün Bilgileri', 'İçindekiler', 'Besin Değerleri', 'Saklama Koşulları', 'Alerjen Uyarısı']
+
+
+def synthetic_frame(rows: int, distinct_names: int = 4096, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    descriptions = []
+    for _ in range(64):
+        tabs = rng.sample(TABS, rng.randint(0, len(TABS)))
+        descriptions.append(json.dumps([{'Tab Index': i, 'Tab Name': name, 'Content': f"{name} içeriği {rng.random():.4f}"}
+                                        for i, name in enumerate(tabs)], ensure_ascii=False))
+    descriptions += ['', '[]', 'not json']
+    names = [" ".join(part for part in (rng.choice(BRANDS), rng.choice(PRODUCTS), f"No {i}",
+                                        rng.choice(SIZES), rng.choice(PACKS)) if part)
+             for i in range(distinct_names)]
+    return pd.DataFrame({
+        'Market': 'migros',
+        'Ürün Adı': [names[rng.randrange(len(names))] for _ in range(rows)],
+        'Marka': [rng.choice(BRANDS) for _ in range(rows)],
+        'İndirimli Fiyat': '-',
+        'Fiyat': [f"{rng.randint(5, 500)},{rng.randint(0, 99):02d} TL" for _ in range(rows)],
+        'Kaynak': [f"https://www.migros.com.tr/urun-p-{i}" for i in range(rows)],
+        'Açıklamalar': [rng.choice(descriptions) for _ in range(rows)],
+    })
+
+
+# The original script, kept verbatim apart from being wrapped in a function
+
+def legacy_extract_adet(product_name):
+    if pd.isna(product_name):
+        return None
+    match = re.search(r'(\d+)\s*[\'\']?[lL][iİıIuUüÜ]', product_name, re.IGNORECASE)
+    if match:
+        return match.group(1)[::-1]
+    match = re.search(r'x\s*(\d+)', product_name, re.IGNORECASE)
+    if match:
+        return match.group(1)[::-1]
+    return None
+
+
+def legacy_extract_birim_miktar(product_name):
+    if pd.isna(product_name):
+        return None, None
+    reversed_name = product_name[::-1]
+    match = re.search(r'([a-zA-Z]+)\s*([\d,\.]+)', reversed_name)
+    if match:
+        return match.group(1)[::-1], match.group(2)[::-1].replace(',', '.')
+    match = re.search(r'([a-zA-Z]+)\s*([\d,\.]+)\s*x', reversed_name, re.IGNORECASE)
+    if match:
+        return match.group(1)[::-1], match.group(2)[::-1].replace(',', '.')
+    return None, None
+
+
+def legacy_process_json_content(json_content, section_names):
+    sections = {name: "-" for name in section_names}
+    for item in json_content:
+        tab_name = item.get("Tab Name", "").strip().lower()
+        content = item.get("Content", "-")
+        normalized_section_names = [name.strip().lower() for name in section_names]
+        if tab_name in normalized_section_names:
+            matched_section = section_names[normalized_section_names.index(tab_name)]
+            sections[matched_section] = content
+    return sections
+
+
+def legacy_is_valid_json(string):
+    try:
+        json.loads(string)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+def legacy_transform(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    if 'Açıklama' not in df.columns:
+        df['Açıklama'] = ""
+    df['Açıklama'] = df['Açıklama'].fillna('')
+    df['Adet'] = df['Ürün Adı'].apply(lambda x: legacy_extract_adet(x) if legacy_extract_adet(x) is not None else '1')
+    df['Birim'], df['Miktar'] = zip(*df['Ürün Adı'].apply(legacy_extract_birim_miktar))
+    keywords = text_splitter.SECTION_NAMES
+
+    def safe_process_json_content(x):
+        if x and legacy_is_valid_json(x):
+            return legacy_process_json_content(json.loads(x), keywords)
+        return {name: "-" for name in keywords}
+
+    sections_df = df['Açıklamalar'].apply(safe_process_json_content)
+    sections_df = pd.DataFrame(sections_df.tolist(), index=df.index)
+    df = pd.concat([df, sections_df], axis=1)
+    df.drop(columns=['Açıklamalar'], inplace=True)
+    df.drop(columns=['Açıklama'], inplace=True)
+    columns = list(df.columns)
+    urun_adi_index = columns.index('Ürün Adı')
+    new_columns_order = columns[:urun_adi_index + 1] + ['Adet', 'Birim', 'Miktar'] + [col for col in columns[urun_adi_index + 1:] if col not in ['Adet', 'Birim', 'Miktar']]
+    df = df[new_columns_order]
+    return df.drop_duplicates()
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def as_text(df: pd.DataFrame) -> pd.DataFrame:
+    # Both versions are compared the way they end up in the CSV: missing values are empty cells
+    return df.astype(object).where(df.notna(), '').astype(str).reset_index(drop=True)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--distinct-names', type=int, default=50_000,
+                        help="How many different product names the file repeats (daily files repeat products)")
+    parser.add_argument('--legacy-rows', type=int, default=None,
+                        help="Run the original script on fewer rows and extrapolate (it takes minutes at 1M)")
+    args = parser.parse_args(argv)
+
+    df = synthetic_frame(args.rows, args.distinct_names)
+    legacy_rows = min(args.legacy_rows or args.rows, args.rows)
+
+    vectorized, vectorized_seconds = timed(text_splitter.transform, df)
+    legacy, legacy_seconds = timed(legacy_transform, df.head(legacy_rows))
+
+    expected = as_text(legacy)
+    actual = as_text(vectorized.head(len(legacy))) if legacy_rows == args.rows else \
+        as_text(text_splitter.transform(df.head(legacy_rows)))
+    pd.testing.assert_frame_equal(actual, expected)
+
+    legacy_estimate = legacy_seconds * args.rows / legacy_rows
+    note = "" if legacy_rows == args.rows else f" (measured on {legacy_rows:,} rows, extrapolated)"
+    print(f"rows:       {args.rows:,} ({args.distinct_names:,} distinct names)")
+    print(f"original:   {legacy_estimate:8.2f}s{note}")
+    print(f"vectorized: {vectorized_seconds:8.2f}s")
+    print(f"speedup:    {legacy_estimate / vectorized_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
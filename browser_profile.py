@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Analytics, tag managers and ad networks the market sites pull in; none of them carry product data
+DEFAULT_BLOCKED_HOSTS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'facebook.net', 'facebook.com', 'connect.facebook.net', 'hotjar.com',
+    'criteo.com', 'criteo.net', 'yandex.ru', 'mc.yandex.ru', 'insider.com', 'useinsider.com',
+    'clarity.ms', 'bing.com', 'tiktok.com', 'analytics.tiktok.com', 'adform.net', 'segment.io',
+    'newrelic.com', 'nr-data.net', 'onesignal.com', 'optimizely.com',
+]
+IMAGE_PATTERNS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico']
+MEDIA_PATTERNS = ['*.mp4', '*.webm', '*.m3u8', '*.mp3', '*.ogg']
+FONT_PATTERNS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+
+
+@dataclass
+class BrowserProfile:
+    """Lean scraping profile, read from the "browser_profile" block of a market config.
+
+    An empty block keeps the browser exactly as before: headed, everything loaded.
+    """
+
+    headless: bool = False
+    block_images: bool = False
+    block_media: bool = False
+    block_fonts: bool = False
+    block_third_party: bool = False
+    blocked_hosts: List[str] = field(default_factory=list)
+    page_load_strategy: Optional[str] = None
+    window_size: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_config(cls, data: Optional[Dict[str, object]]) -> 'BrowserProfile':
+        data = dict(data or {})
+        if data.get('window_size'):
+            data['window_size'] = tuple(data['window_size'])
+        return cls(**data)
+
+    @property
+    def hosts_to_block(self) -> List[str]:
+        return (DEFAULT_BLOCKED_HOSTS if self.block_third_party else []) + list(self.blocked_hosts)
+
+    @property
+    def url_patterns_to_block(self) -> List[str]:
+        patterns = []
+        if self.block_images:
+            patterns += IMAGE_PATTERNS
+        if self.block_media:
+            patterns += MEDIA_PATTERNS
+        if self.block_fonts:
+            patterns += FONT_PATTERNS
+        # CDP patterns are wildcards over the full URL
+        patterns += [f"*://{host}/*" for host in self.hosts_to_block]
+        patterns += [f"*://*.{host}/*" for host in self.hosts_to_block]
+        return patterns
+
+
+def apply_chromium(options, profile: BrowserProfile, headless: bool) -> None:
+    """Chrome and Edge share Chromium's switches and content settings."""
+    if headless or profile.headless:
+        options.add_argument('--headless=new')
+    if profile.window_size:
+        options.add_argument(f"--window-size={profile.window_size[0]},{profile.window_size[1]}")
+    if profile.page_load_strategy:
+        options.page_load_strategy = profile.page_load_strategy
+    prefs = {}
+    if profile.block_images:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        prefs['profile.managed_default_content_settings.images'] = 2
+    if profile.block_media:
+        options.add_argument('--autoplay-policy=user-gesture-required')
+    if prefs:
+        options.add_experimental_option('prefs', prefs)
+    if profile.block_images or profile.block_fonts or profile.block_media or profile.hosts_to_block:
+        options.add_argument('--disable-extensions')
+        options.add_argument('--mute-audio')
+
+
+def after_chromium_start(driver, profile: BrowserProfile) -> None:
+    # Fonts, media and third-party hosts have no content setting; block them at the network layer
+    patterns = profile.url_patterns_to_block
+    if patterns:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+def _proxy_autoconfig(hosts: List[str]) -> str:
+    # Blocked hosts go to a closed local port and fail instantly; everything else connects directly
+    conditions = " || ".join(f'dnsDomainIs(host, "{host}") || host == "{host}"' for host in hosts)
+    script = ("function FindProxyForURL(url, host) {"
+              f" if ({conditions}) return 'PROXY 127.0.0.1:9'; return 'DIRECT'; }}")
+    return "data:application/x-ns-proxy-autoconfig," + script
+
+
+def apply_firefox(options, profile: BrowserProfile, headless: bool) -> None:
+    if headless or profile.headless:
+        options.add_argument('-headless')
+    if profile.window_size:
+        options.add_argument(f"--width={profile.window_size[0]}")
+        options.add_argument(f"--height={profile.window_size[1]}")
+    if profile.page_load_strategy:
+        options.page_load_strategy = profile.page_load_strategy
+    if profile.block_images:
+        options.set_preference('permissions.default.image', 2)
+    if profile.block_media:
+        options.set_preference('media.autoplay.default', 5)
+        options.set_preference('media.mediasource.enabled', False)
+        options.set_preference('media.play-stand-alone', False)
+    if profile.block_fonts:
+        options.set_preference('gfx.downloadable_fonts.enabled', False)
+        options.set_preference('browser.display.use_document_fonts', 0)
+    hosts = profile.hosts_to_block
+    if hosts:
+        # Firefox has no request blocking over WebDriver, a PAC script does the same job
+        options.set_preference('network.proxy.type', 2)
+        options.set_preference('network.proxy.autoconfig_url', _proxy_autoconfig(hosts))
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_CACHE_DIR = os.path.join("marketplace", ".cache")
+# Bumped whenever the cached layout changes so stale caches are rebuilt
+INDEX_VERSION = 1
+PATH_SEPARATOR = '/'
+
+
+def normalize_mapper(category_mapper: Dict) -> Dict:
+    """category_mapper.json maps each category straight to {market: url}; wrap those
+    entries in the {"urls": ...} form subcategory_mapper.json and scrape_category use."""
+    for name, category_data in category_mapper['categories'].items():
+        if 'urls' not in category_data and 'subcategories' not in category_data:
+            category_mapper['categories'][name] = {'urls': category_data}
+    return category_mapper
+
+
+@dataclass
+class CategoryNode:
+    path: List[str]
+    urls: Dict[str, str]
+    children: List[str] = field(default_factory=list)  # child names, in mapper order
+
+    @property
+    def name(self) -> str:
+        return self.path[-1]
+
+    @property
+    def leaf(self) -> bool:
+        return not self.children
+
+
+def path_key(path: List[str]) -> str:
+    return PATH_SEPARATOR.join(path)
+
+
+class CategoryIndex:
+    """Flattened category tree: every node keyed by its full path, e.g. "icecek/cay".
+
+    Looking up a category and its URL for a market is a dict lookup however
+    deep the tree is. ``load`` keeps the flattened form in a JSON cache that is
+    rebuilt only when the mapper file changes.
+    """
+
+    def __init__(self, nodes: Dict[str, CategoryNode], roots: List[str]):
+        self.nodes = nodes
+        self.roots = roots
+
+    @classmethod
+    def from_mapper(cls, category_mapper: Dict) -> 'CategoryIndex':
+        nodes: Dict[str, CategoryNode] = {}
+
+        def add(path: List[str], category_data: Dict) -> None:
+            subcategories = category_data.get('subcategories', {})
+            nodes[path_key(path)] = CategoryNode(path, dict(category_data.get('urls', {})), list(subcategories))
+            for name, subcategory_data in subcategories.items():
+                add(path + [name], subcategory_data)
+
+        categories = normalize_mapper(category_mapper)['categories']
+        for name, category_data in categories.items():
+            add([name], category_data)
+        return cls(nodes, list(categories))
+
+    @classmethod
+    def load(cls, mapper_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> 'CategoryIndex':
+        """Index of ``mapper_path``, read from the cache when the mapper has not changed.
+
+        The cache is trusted straight away when the mapper's size and mtime match;
+        otherwise the content hash decides, so a touched but unchanged file
+        only costs a hash.
+        """
+        stat = os.stat(mapper_path)
+        signature = {'version': INDEX_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        cache_path = os.path.join(cache_dir, os.path.basename(mapper_path) + '.index.json')
+        cached = None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            pass
+        if cached is not None and cached.get('version') == INDEX_VERSION and \
+                (cached.get('size'), cached.get('mtime_ns')) == (stat.st_size, stat.st_mtime_ns):
+            return cls._from_cache(cached)
+
+        with open(mapper_path, 'rb') as file:
+            content = file.read()
+        digest = hashlib.sha1(content).hexdigest()
+        if cached is not None and cached.get('version') == INDEX_VERSION and cached.get('sha1') == digest:
+            index = cls._from_cache(cached)
+        else:
+            index = cls.from_mapper(json.loads(content.decode('utf-8')))
+        index._write_cache(cache_path, {**signature, 'sha1': digest})
+        return index
+
+    @classmethod
+    def _from_cache(cls, cached: Dict) -> 'CategoryIndex':
+        nodes = {key: CategoryNode(node['path'], node['urls'], node['children'])
+                 for key, node in cached['nodes'].items()}
+        return cls(nodes, cached['roots'])
+
+    def _write_cache(self, cache_path: str, signature: Dict) -> None:
+        """Atomically replace the cache; fan_out and the GUI start several scrapers at once,
+        so each writes its own temp file."""
+        directory = os.path.dirname(cache_path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(cache_path) + '.',
+                                                          suffix='.tmp')
+            try:
+                with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                    json.dump({**signature, 'roots': self.roots,
+                               'nodes': {key: {'path': node.path, 'urls': node.urls, 'children': node.children}
+                                         for key, node in self.nodes.items()}}, file, ensure_ascii=False)
+                os.replace(temporary_path, cache_path)
+            except BaseException:
+                os.remove(temporary_path)
+                raise
+        except OSError as e:
+            # The index is already built; the cache only saves parsing the mapper next time
+            print(f"Could not write the category index cache {cache_path}: {e}")
+
+    def get(self, path: List[str]) -> Optional[CategoryNode]:
+        return self.nodes.get(path_key(path))
+
+    def url(self, path: List[str], market: str) -> Optional[str]:
+        node = self.get(path)
+        return node.urls.get(market) if node else None
+
+    def walk(self, path: List[str]) -> Iterator[CategoryNode]:
+        """The node at ``path`` and everything below it, parents before their subcategories."""
+        stack = [path_key(path)]
+        while stack:
+            node = self.nodes[stack.pop()]
+            yield node
+            stack.extend(path_key(node.path + [child]) for child in reversed(node.children))
+
+    def leaves(self, market: Optional[str] = None) -> List[CategoryNode]:
+        """Leaf categories in tree order, optionally only those with a URL for ``market``."""
+        return [node for root in self.roots for node in self.walk([root])
+                if node.leaf and (market is None or market in node.urls)]
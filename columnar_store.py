@@ -0,0 +1,106 @@
+import argparse
+import os
+import sys
+import uuid
+from typing import List, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from prices import parse_price
+from result_sink import read_results
+
+DEFAULT_ROOT = os.path.join("marketplace", "parquet")
+PARTITION_COLUMNS = ['Market', 'scrape_date']
+PRICE_COLUMNS = ['İndirimli Fiyat', 'Fiyat']
+PRICE_TYPE = pa.decimal128(12, 2)
+PARTITIONING = ds.partitioning(pa.schema([('Market', pa.string()), ('scrape_date', pa.string())]), flavor='hive')
+# Compacted files aim for row groups this large; small per-category files rarely reach it
+ROW_GROUP_SIZE = 256 * 1024
+
+
+def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """Type a scraper/text_splitter DataFrame: decimal prices, timestamps, numeric amounts, strings."""
+    columns = {}
+    scraped_at = pd.to_datetime(df['Tarih'], errors='coerce') if 'Tarih' in df.columns else None
+    for column in df.columns:
+        values = df[column]
+        if column in PRICE_COLUMNS:
+            columns[column] = pa.array([parse_price(value) for value in values], type=PRICE_TYPE)
+        elif column == 'Tarih':
+            columns[column] = pa.array(scraped_at, type=pa.timestamp('s'))
+        elif column == 'Miktar':
+            columns[column] = pa.array(pd.to_numeric(values, errors='coerce'), type=pa.float64())
+        elif column == 'Adet':
+            columns[column] = pa.array(pd.to_numeric(values, errors='coerce').astype('Int32'), type=pa.int32())
+        else:
+            columns[column] = pa.array(values.astype('string'), type=pa.string())
+    if scraped_at is not None:
+        columns['scrape_date'] = pa.array(scraped_at.dt.strftime('%Y-%m-%d').fillna('unknown'), type=pa.string())
+    else:
+        columns['scrape_date'] = pa.array([pd.Timestamp.now().strftime('%Y-%m-%d')] * len(df), type=pa.string())
+    return pa.table(columns)
+
+
+def write_partitioned(df: pd.DataFrame, root: str = DEFAULT_ROOT) -> int:
+    """Append ``df`` to the dataset under ``root`` as Market=<m>/scrape_date=<d>/part-*.parquet."""
+    if df.empty:
+        return 0
+    table = to_arrow_table(df)
+    ds.write_dataset(table, root, format='parquet', partitioning=PARTITIONING,
+                     basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                     existing_data_behavior='overwrite_or_ignore',
+                     file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'))
+    return table.num_rows
+
+
+def open_dataset(root: str = DEFAULT_ROOT) -> ds.Dataset:
+    """Dataset over the whole store; filter on Market/scrape_date to prune partitions."""
+    return ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+
+
+def _partition_directories(root: str) -> List[str]:
+    directories = []
+    for market_entry in sorted(os.scandir(root), key=lambda entry: entry.name):
+        if market_entry.is_dir() and market_entry.name.startswith('Market='):
+            directories.extend(entry.path for entry in sorted(os.scandir(market_entry.path), key=lambda e: e.name)
+                               if entry.is_dir() and entry.name.startswith('scrape_date='))
+    return directories
+
+
+def compact(root: str = DEFAULT_ROOT) -> None:
+    """Merge the small per-category files of every partition into one file with large row groups."""
+    for directory in _partition_directories(root):
+        parts = sorted(entry.path for entry in os.scandir(directory) if entry.name.endswith('.parquet'))
+        if len(parts) < 2:
+            continue
+        # Partition columns live in the path, not in the files; unify schemas across older writes
+        table = pa.concat_tables([pq.read_table(part) for part in parts], promote_options='default')
+        compacted_path = os.path.join(directory, f"compacted-{uuid.uuid4().hex}.parquet")
+        temporary_path = compacted_path + '.tmp'
+        pq.write_table(table, temporary_path, compression='zstd', row_group_size=ROW_GROUP_SIZE)
+        os.replace(temporary_path, compacted_path)
+        for part in parts:
+            os.remove(part)
+        print(f"Compacted {len(parts)} files ({table.num_rows} rows) in {directory}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Columnar Parquet store for scraped results")
+    parser.add_argument('--root', default=DEFAULT_ROOT, help="Dataset directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    write_command = commands.add_parser('write', help="Append CSV or JSONL results to the dataset")
+    write_command.add_argument('result_files', nargs='+')
+    commands.add_parser('compact', help="Merge small files inside each partition")
+    args = parser.parse_args(argv)
+
+    if args.command == 'write':
+        for result_file in args.result_files:
+            rows = write_partitioned(read_results(result_file), args.root)
+            print(f"Wrote {rows} rows from {result_file} to {args.root}")
+    elif args.command == 'compact':
+        compact(args.root)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
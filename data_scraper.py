@@ -1,12 +1,10 @@
+import argparse
 import json
 import sys
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.edge.options import Options as EdgeOptions
@@ -15,14 +13,80 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException
 from urllib.parse import urljoin, urlparse
-from selenium.common.exceptions import InvalidArgumentException
-import pandas as pd
+from selenium.common.exceptions import InvalidArgumentException, TimeoutException, WebDriverException
 import time
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 import subprocess
 import os
-from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import partial
+from driver_session import DriverPool, DriverSession
+from rate_limiter import AdaptiveRateLimiter, CircuitOpenError, RetryPolicy
+from wait_profiler import WaitProfiler
+from pagination import ListingPage, PaginationPlan, page_url, parse_count
+from browser_profile import BrowserProfile, after_chromium_start, apply_chromium, apply_firefox
+import driver_resolver
+from category_index import CategoryIndex, normalize_mapper, path_key
+from selector_plan import compile_plan
+from batch_extractor import BatchExtractor, MissingElementsError
+from metrics import Metrics
+from product_index import ProductIndex, canonical_url, content_hash
+from result_sink import DeadLetterLog, RunCheckpoint, open_sink, read_results
+import text_splitter
+
+# Seconds to wait for each readiness condition, overridable per market via "timeouts"
+DEFAULT_TIMEOUTS = {
+    'listing_page': 10,
+    'product_page': 10,
+    'description_tab': 5,
+    'scroll': 2,
+}
+
+# Visible text of each product link's card: the largest ancestor that holds no other product link
+CARD_TEXT_SCRIPT = """
+const links = arguments[0];
+return links.map(function (link) {
+    const href = link.getAttribute('href');
+    let card = link;
+    while (card.parentElement && card.parentElement !== document.body && !links.some(function (other) {
+        return other.getAttribute('href') !== href && card.parentElement.contains(other);
+    })) {
+        card = card.parentElement;
+    }
+    return card.innerText;
+});
+"""
+
+class ProductPageError(Exception):
+    """A product page yielded no product; ``__cause__`` is the underlying failure."""
+
+class PageNotReadyError(Exception):
+    """A page loaded without the elements that mark it ready, e.g. a throttling or captcha page."""
+
+def is_transient(error: BaseException) -> bool:
+    """Whether retrying can help: a page that never came up or a browser error, but not
+    a selector that matched nothing on a page that was ready."""
+    if isinstance(error, ProductPageError) and error.__cause__ is not None:
+        error = error.__cause__
+    return isinstance(error, (PageNotReadyError, WebDriverException)) and \
+        not isinstance(error, NoSuchElementException)
+
+@dataclass
+class CategoryProgress:
+    """Products of a category that were handed out but are not finished, keyed by (page, index on page).
+
+    Products of several listing pages can be in flight on the pool at once, so the
+    resume point is the first unfinished product, or the next listing page when
+    everything handed out is done.
+    """
+    next_page: int
+    in_flight: set = field(default_factory=set)
+    futures: Dict[Future, Tuple[int, int]] = field(default_factory=dict)
+    finished: int = 0
+
+    def resume_point(self) -> Tuple[int, int]:
+        return min(self.in_flight, default=(self.next_page, 0))
 
 @dataclass
 class ScraperConfig:
@@ -30,111 +94,310 @@ class ScraperConfig:
     selectors: Dict[str, str]
     grid_class: str
     output_file: str
+    timeouts: Dict[str, float] = field(default_factory=dict)
+    # Optional keys: page_param, page_size, and total_count/total_pages XPaths on the first listing page.
+    # Only migros ships a way to see the last page (its next_page selector); a101 and sok have neither
+    # yet, so their categories still end by loading one empty page past the last one.
+    pagination: Dict[str, object] = field(default_factory=dict)
+    browser: Optional[str] = None  # Default browser for the market when none is given
+    browser_profile: Dict[str, object] = field(default_factory=dict)
+    # Pin the driver binary instead of asking webdriver-manager for the latest one
+    driver_path: Optional[str] = None
+    driver_version: Optional[str] = None
+
+    def timeout(self, name: str) -> float:
+        return self.timeouts.get(name, DEFAULT_TIMEOUTS[name])
 
 class WebScraper:
-    def __init__(self, config: ScraperConfig, category_mapper: Dict[str, Dict[str, str]], browser: str):
+    def __init__(self, config: ScraperConfig, category_mapper: Optional[Dict[str, Dict[str, str]]], browser: str,
+                 workers: int = 1, rate_limit: Optional[float] = None, headless: bool = False,
+                 fetch_backend: str = 'webdriver', extraction_mode: str = 'elements',
+                 product_index: Optional[ProductIndex] = None, output_format: str = 'csv',
+                 fsync_every: int = 20, resume: bool = False, parquet_root: Optional[str] = None,
+                 postprocess: str = 'inline', metrics_dir: Optional[str] = os.path.join('marketplace', 'metrics'),
+                 retries: int = 3, category_index: Optional[CategoryIndex] = None):
         self.config = config
+        # Selectors are validated once here, so a broken config fails before any browser starts
+        self.plan = compile_plan(config)
         self.category_mapper = category_mapper
-        self.elements_info = []
-        self.browser = browser  # Set browser from argument
-        self.driver = self._initialize_driver()
-        self.latest_url = None  # Track the latest visited URL
-        
-    def _initialize_driver(self) -> webdriver.Chrome:
+        self.category_index = category_index or CategoryIndex.from_mapper(category_mapper)
+        # Rows are streamed to a per-category sink as soon as they are extracted
+        self.sink = None
+        # Final result file of every category scraped in this run
+        self.saved_files: List[str] = []
+        self.output_format = output_format
+        self.fsync_every = fsync_every
+        self.resume = resume
+        # Post-processed results are also appended to this partitioned Parquet dataset
+        self.parquet_root = parquet_root
+        # 'inline' enriches each row with text_splitter before it is written, giving one combined
+        # file; 'subprocess' keeps the raw file plus the _updated.csv written by text_splitter.py
+        if postprocess not in ('inline', 'subprocess'):
+            raise ValueError(f"Unsupported post-processing mode: {postprocess}")
+        self.postprocess = postprocess
+        self.section_lookup = text_splitter.build_section_lookup()
+        self.checkpoint = RunCheckpoint(os.path.join("marketplace", config.name, f"{config.output_file}.checkpoint.json"))
+        # Product URLs that failed every retry, re-run with --retry-dead-letters
+        self.dead_letters = DeadLetterLog(os.path.join("marketplace", config.name, f"{config.output_file}.dead_letters.jsonl"))
+        self.browser = browser or config.browser or 'chrome'  # Set browser from argument
+        self.headless = headless
+        self.profile = BrowserProfile.from_config(config.browser_profile)
+        self._created_at = time.perf_counter()
+        self._first_page_reported = False
+        # One driver is kept alive for the whole tree walk and restarted on crashes.
+        # It loads listing pages; product pages go to the worker pool when there is one.
+        self.session = DriverSession(self._initialize_driver)
+        self.pool = DriverPool(partial(self._initialize_driver, headless=True), workers) if workers > 1 else None
+        # Shared by every fetch; rate_limit caps the per-host rate it adapts towards, 0 disables it
+        self.rate_limiter = AdaptiveRateLimiter(max_rate=rate_limit)
+        self.retry_policy = RetryPolicy(attempts=max(retries, 1))
+        self.profiler = WaitProfiler()
+        # Counters and latency histograms tagged by market and category, exported by close()
+        self.metrics = Metrics(market=config.name)
+        self.metrics_dir = metrics_dir
+        self._category: Optional[str] = None
+        # Full category path the resume checkpoint stores the current category under
+        self._checkpoint_key: Optional[str] = None
+        self.http_fetcher = self._initialize_fetcher(fetch_backend, workers)
+        self.batch_extractor = self._initialize_extractor(extraction_mode)
+        # When set, only new or changed products get a detail page visit
+        self.product_index = product_index
+        # Listing card hash of each queued product, stored with it once its detail page is written
+        self._card_hashes: Dict[str, Optional[str]] = {}
+
+    @property
+    def driver(self) -> webdriver.Remote:
+        return self.session.driver
+
+    def _tags(self, **labels: object) -> Dict[str, object]:
+        return {'category': self._category, **labels}
+
+    def _load(self, url: str, session: Optional[DriverSession] = None, page_type: str = 'product',
+              record: bool = True) -> float:
+        """Open ``url`` and return the load time. ``record=False`` leaves reporting a loaded
+        page to the rate limiter to the caller, which knows whether the page was usable."""
+        session = session or self.session
+        self.rate_limiter.wait(url)
+        self.metrics.increment('page_loads', **self._tags(page=page_type))
+        started = time.perf_counter()
+        with self.metrics.timer('page_load', **self._tags(page=page_type)):
+            try:
+                session.driver.get(url)
+            except WebDriverException:
+                if session.is_alive():
+                    self.rate_limiter.record(url, time.perf_counter() - started, ok=False)
+                    raise
+                # The browser crashed, retry once on a fresh driver
+                self.metrics.increment('driver_restarts', **self._tags())
+                session.restart()
+                session.driver.get(url)
+        seconds = time.perf_counter() - started
+        if record:
+            self.rate_limiter.record(url, seconds, ok=True)
+        if not self._first_page_reported:
+            self._first_page_reported = True
+            print(f"Startup to first page: {time.perf_counter() - self._created_at:.1f}s "
+                  f"(driver resolution {driver_resolver.resolution_seconds:.1f}s)")
+        return seconds
+
+    def _wait(self, driver: webdriver.Remote, condition, timeout_name: str) -> bool:
+        """Block until ``condition`` holds, returning False instead of raising on timeout."""
+        with self.profiler.measure('wait'):
+            try:
+                WebDriverWait(driver, self.config.timeout(timeout_name), poll_frequency=0.2).until(condition)
+                return True
+            except TimeoutException:
+                return False
+
+    def _wait_for_listing(self, driver: Optional[webdriver.Remote] = None) -> bool:
+        return self._wait(driver or self.driver, EC.presence_of_element_located(self.plan.grid), 'listing_page')
+
+    def _wait_for_product(self, driver: webdriver.Remote) -> bool:
+        price_conditions = [EC.presence_of_element_located((By.XPATH, xpath))
+                            for xpath in self.plan.xpaths('current_price')]
+        return self._wait(driver, EC.all_of(
+            EC.any_of(*(EC.presence_of_element_located((By.XPATH, xpath))
+                        for xpath in self.plan.xpaths('product_name'))),
+            EC.any_of(*price_conditions),
+        ), 'product_page')
+
+    def _initialize_fetcher(self, fetch_backend: str, workers: int):
+        if fetch_backend == 'webdriver':
+            return None
+        if fetch_backend == 'http':
+            # Imported lazily so the browser-only path does not need requests/lxml
+            from http_fetcher import HttpFetcher
+            return HttpFetcher(self.plan, pool_size=max(workers, 1) * 2,
+                               timeout=self.config.timeout('product_page'))
+        raise ValueError(f"Unsupported fetch backend: {fetch_backend}")
+
+    def _initialize_extractor(self, extraction_mode: str):
+        if extraction_mode == 'elements':
+            return None
+        if extraction_mode == 'batch':
+            return BatchExtractor(self.plan, tab_timeout=self.config.timeout('description_tab'))
+        raise ValueError(f"Unsupported extraction mode: {extraction_mode}")
+
+    def close(self) -> None:
+        if self.product_index is not None:
+            print(self.product_index.summary())
+        print(self.rate_limiter.summary())
+        if self.http_fetcher is not None:
+            print(self.http_fetcher.summary())
+            self.http_fetcher.close()
+        if self.profiler.seconds:
+            print(self.profiler.summary())
+        if self.session.starts:
+            print(self.session.summary())
+        self.session.quit()
+        if self.pool is not None:
+            print(self.pool.summary())
+            self.pool.quit()
+        self._export_metrics()
+
+    def _export_metrics(self) -> None:
+        if not self.metrics_dir or not (self.metrics.counters or self.metrics.histograms):
+            return
+        print(self.metrics.summary())
+        timestamp = time.strftime('%Y%m%d_%H%M%S', time.localtime())
+        json_path = os.path.join(self.metrics_dir, f"{self.config.name}_{timestamp}.json")
+        self.metrics.write_json(json_path)
+        # Overwritten every run so a textfile collector always sees the latest one
+        self.metrics.write_prometheus(os.path.join(self.metrics_dir, f"{self.config.name}.prom"))
+        print(f"Metrics saved to {json_path}")
+
+    def _driver_service_path(self) -> str:
+        return driver_resolver.resolve_driver_path(self.browser, self.config.driver_path, self.config.driver_version)
+
+    def _initialize_driver(self, headless: Optional[bool] = None) -> webdriver.Chrome:
+        headless = self.headless if headless is None else headless
         if self.browser.lower() == 'chrome':
             chrome_options = ChromeOptions()
+            apply_chromium(chrome_options, self.profile, headless)
             chrome_options.add_argument('--ignore-certificate-errors')
             chrome_options.add_argument('--ignore-ssl-errors')
             chrome_options.add_argument('--disable-web-security')
             chrome_options.add_argument('--allow-running-insecure-content')
-            service = ChromeService(ChromeDriverManager().install())
-            return webdriver.Chrome(service=service, options=chrome_options)
+            service = ChromeService(self._driver_service_path())
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+            after_chromium_start(driver, self.profile)
+            return driver
         elif self.browser.lower() == 'firefox':
             firefox_options = FirefoxOptions()
+            apply_firefox(firefox_options, self.profile, headless)
             firefox_options.add_argument('--ignore-certificate-errors')
             firefox_options.add_argument('--ignore-ssl-errors')
             firefox_options.add_argument('--disable-web-security')
             firefox_options.add_argument('--allow-running-insecure-content')
-            service = FirefoxService(GeckoDriverManager().install())
+            service = FirefoxService(self._driver_service_path())
             return webdriver.Firefox(service=service, options=firefox_options)
         elif self.browser.lower() == 'edge':
             edge_options = EdgeOptions()
+            apply_chromium(edge_options, self.profile, headless)
             edge_options.add_argument('--ignore-certificate-errors')
             edge_options.add_argument('--ignore-ssl-errors')
             edge_options.add_argument('--disable-web-security')
             edge_options.add_argument('--allow-running-insecure-content')
-            service = EdgeService(EdgeChromiumDriverManager().install())
-            return webdriver.Edge(service=service, options=edge_options)
+            service = EdgeService(self._driver_service_path())
+            driver = webdriver.Edge(service=service, options=edge_options)
+            after_chromium_start(driver, self.profile)
+            return driver
         else:
             raise ValueError(f"Unsupported browser: {self.browser}")
 
-    def extract_element_info(self, category_name: str) -> None:
+    def extract_element_info(self, category_name: str, driver: Optional[webdriver.Remote] = None) -> None:
+        driver = driver or self.driver
+        with self.profiler.measure('extract'):
+            if self.batch_extractor is not None:
+                self._extract_in_batch(category_name, driver)
+            else:
+                self._extract_element_info(category_name, driver)
+
+    def _extract_in_batch(self, category_name: str, driver: webdriver.Remote) -> None:
+        try:
+            fields = self.batch_extractor.extract_fields(driver, self._observe_lookup)
+        except MissingElementsError as e:
+            for selector in e.missing:
+                self.metrics.increment('selector_failures', **self._tags(selector=selector))
+            self.metrics.increment('extraction_failures', **self._tags(stage='batch'))
+            raise ProductPageError(f"Error extracting product information: {e}") from e
+        except Exception as e:
+            self.metrics.increment('extraction_failures', **self._tags(stage='batch'))
+            raise ProductPageError(f"Error extracting product information: {e}") from e
+        self._add_fields(category_name, fields)
+
+    def _observe_lookup(self, field_name: str, seconds: float) -> None:
+        self.metrics.observe('selector_lookup', seconds, **self._tags(selector=field_name))
+
+    def _find(self, driver: webdriver.Remote, field_name: str, required: bool = True):
+        """find_element for a field, trying its selector and then its fallback.
+
+        Lookups are timed per field, fallbacks included, like the batch script does. A
+        selector failure is only counted when a required field matched none of them.
+        """
+        started = time.perf_counter()
+        try:
+            for _, xpath in self.plan.fields.get(field_name, ()):
+                try:
+                    return driver.find_element(By.XPATH, xpath)
+                except NoSuchElementException:
+                    pass
+        finally:
+            self._observe_lookup(field_name, time.perf_counter() - started)
+        if required:
+            self.metrics.increment('selector_failures', **self._tags(selector=field_name))
+        raise NoSuchElementException(f"No configured selector matched '{field_name}'")
+
+    def _extract_element_info(self, category_name: str, driver: webdriver.Remote) -> None:
         try:
             # Extract common elements using configured selectors
-            image_element = self.driver.find_element(By.XPATH, self.config.selectors['image'])
+            image_element = self._find(driver, 'image')
             image_url = image_element.get_dom_attribute('src')
             
-            product_name_element = self.driver.find_element(By.XPATH, self.config.selectors['product_name'])
+            product_name_element = self._find(driver, 'product_name')
             product_name = product_name_element.text
     
-            brand_name_element = self.driver.find_element(By.XPATH, self.config.selectors['brand'])
-            brand_name = brand_name_element.text
+            # Not every market shows a brand on the product page
+            brand_name = self._find(driver, 'brand').text if self.plan.has('brand') else "-"
     
-            # Extract current price with fallback
-            try:
-                current_price_element = self.driver.find_element(By.XPATH, self.config.selectors['current_price'])
-            except NoSuchElementException:
-                current_price_element = self.driver.find_element(By.XPATH, self.config.selectors['current_price_fallback'])
+            # The plan tries current_price_fallback when current_price is missing
+            current_price_element = self._find(driver, 'current_price')
             current_price = current_price_element.text.strip()
     
             try:
-                old_price_element = self.driver.find_element(By.XPATH, self.config.selectors['old_price'])
+                old_price_element = self._find(driver, 'old_price', required=False)
                 old_price = old_price_element.text.strip()
             except NoSuchElementException:
                 old_price = "-"
             
-            # If old_price is null, assign current_price to old_price and set current_price to "-"
-            if not old_price or old_price == "-":
-                old_price = current_price
-                current_price = "-"
-    
-            # Initialize the product information dictionary
-            product_info = {
-                'Market': self.config.name,
-                'Resim': image_url,
-                'Ürün Adı': product_name,
-                'Marka': brand_name,
-                'İndirimli Fiyat': current_price,
-                'Fiyat': old_price,
-                'Kategori': category_name,
-                'Kaynak': self.driver.current_url,
-                'Tarih': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
-            }
+            product_info = self._build_product_info(category_name, driver.current_url, image_url,
+                                                    product_name, brand_name, current_price, old_price)
     
             # Handle multiple sections for description
-            if 'description_tabs' in self.config.selectors:
+            if self.plan.description_tabs:
                 try:
-                    tab_elements = self.driver.find_elements(By.XPATH, self.config.selectors['description_tabs'])
+                    tab_elements = driver.find_elements(By.XPATH, self.plan.description_tabs)
+                    description_locator = (By.XPATH, self.plan.description)
                     all_descriptions = []
+                    previous_content = None
     
                     for tab_index, tab in enumerate(tab_elements):
                         try:
                             # Use JavaScript to click the tab
-                            self.driver.execute_script("arguments[0].scrollIntoView(true);", tab)
-                            self.driver.execute_script("arguments[0].click();", tab)
-                            WebDriverWait(self.driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, self.config.selectors['description']))
-                            )
-                            time.sleep(1)  # Wait for the tab content to load
+                            driver.execute_script("arguments[0].scrollIntoView(true);", tab)
+                            driver.execute_script("arguments[0].click();", tab)
+                            # Wait for the tab content to load, i.e. for the panel to show something new
+                            self._wait(driver, lambda d: self._description_text(d, description_locator)
+                                       not in ("", previous_content), 'description_tab')
     
                             # Extract content from the active tab
-                            description_elements = self.driver.find_elements(By.XPATH, self.config.selectors['description'])
-                            tab_content = [element.text.strip() for element in description_elements if element.text.strip()]
+                            content = self._description_text(driver, description_locator)
+                            previous_content = content
                             tab_name = tab.text.strip() if tab.text.strip() else "-"
                             all_descriptions.append({
                                 'Tab Index': tab_index,
                                 'Tab Name': tab_name,
-                                'Content': " ".join(tab_content)
+                                'Content': content
                             })
                         except Exception as e:
                             print(f"Error clicking tab {tab_index}: {e}")
@@ -144,174 +407,493 @@ class WebScraper:
                 except NoSuchElementException:
                     product_info['Açıklamalar'] = "[]"
     
-            # Append the product info to the elements_info list
-            self.elements_info.append(product_info)
+            self._add_result(product_info)
     
         except Exception as e:
-            print(f"Error extracting product information: {e}")
+            self.metrics.increment('extraction_failures', **self._tags(stage='elements'))
+            raise ProductPageError(f"Error extracting product information: {e}") from e
+
+    def _build_product_info(self, category_name: str, url: str, image_url: Optional[str], product_name: str,
+                            brand_name: str, current_price: str, old_price: str) -> Dict[str, str]:
+        # If old_price is null, assign current_price to old_price and set current_price to "-"
+        if not old_price or old_price == "-":
+            old_price = current_price
+            current_price = "-"
+
+        return {
+            'Market': self.config.name,
+            'Resim': image_url,
+            'Ürün Adı': product_name,
+            'Marka': brand_name,
+            'İndirimli Fiyat': current_price,
+            'Fiyat': old_price,
+            'Kategori': category_name,
+            'Kaynak': url,
+            'Tarih': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+        }
+
+    def _add_result(self, product_info: Dict[str, str]) -> None:
+        if self.postprocess == 'inline':
+            written = self.sink.write(text_splitter.transform_row(product_info, self.section_lookup))
+        else:
+            written = self.sink.write(product_info)
+        self.metrics.increment('rows_written' if written else 'rows_duplicate', **self._tags())
+        if self.product_index is not None:
+            card_hash = self._card_hashes.pop(canonical_url(product_info['Kaynak']), None)
+            self.product_index.record(product_info, card_hash)
+
+    def _extract_over_http(self, href: str, category_name: str) -> bool:
+        """Try the HTTP backend first; False means the page needs the browser."""
+        # Imported lazily like HttpFetcher itself
+        from http_fetcher import TransportError
+        self.rate_limiter.wait(href)
+        started = time.perf_counter()
+        try:
+            with self.profiler.measure('http'):
+                fields = self.http_fetcher.extract_fields(href)
+        except TransportError as e:
+            # Throttling and connection errors slow the host down; the browser then
+            # tries the page at the lowered rate
+            self.rate_limiter.record(href, time.perf_counter() - started, ok=False)
+            self.metrics.increment('http_fallbacks', **self._tags())
+            print(f"HTTP fetch fell back to the browser for {href}: {e}")
+            return False
+        if fields is not None:
+            # A miss may just be a selector problem, so only transport failures count against the host
+            self.rate_limiter.record(href, time.perf_counter() - started, ok=True)
+        if fields is None:
+            self.metrics.increment('http_fallbacks', **self._tags())
+            return False
+        self._add_fields(category_name, fields)
+        return True
+
+    def _add_fields(self, category_name: str, fields: Dict[str, object]) -> None:
+        """Turn the field dict returned by the HTTP or batch extractors into a result row."""
+        product_info = self._build_product_info(category_name, fields['url'], fields['image'],
+                                                fields['product_name'], fields['brand'],
+                                                fields['current_price'], fields['old_price'])
+        if fields['descriptions'] is not None:
+            product_info['Açıklamalar'] = json.dumps(fields['descriptions'], ensure_ascii=False)
+        self._add_result(product_info)
 
-    def scroll_page(self) -> None:
-        scroll_pause_time = 2
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
+    @staticmethod
+    def _description_text(driver: webdriver.Remote, locator: tuple) -> str:
+        texts = (element.text.strip() for element in driver.find_elements(*locator))
+        return " ".join(text for text in texts if text)
+
+    def scroll_page(self, driver: Optional[webdriver.Remote] = None, expected_cards: Optional[int] = None) -> None:
+        driver = driver or self.driver
+
+        def enough_cards(d) -> bool:
+            return expected_cards is not None and len(self._card_links(d)) >= expected_cards
+
+        last_height = driver.execute_script("return document.body.scrollHeight")
         
-        while True:
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(scroll_pause_time)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
+        # Static pages and pages that already show every expected card need no scrolling at all
+        while not enough_cards(driver):
+            self.metrics.increment('scroll_passes', **self._tags())
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            # Stop as soon as lazy loading grows the page, or give up after the scroll timeout
+            grew = self._wait(driver,
+                              lambda d: enough_cards(d) or d.execute_script("return document.body.scrollHeight") != last_height,
+                              'scroll')
+            if not grew:
                 break
-            last_height = new_height
-
-    def go_to_next_page(self, base_url: str, current_page: int) -> bool:
-        # Parse the base URL
-        parsed_url = urlparse(base_url)
-        # Remove the 'sayfa' query parameter if it exists
-        query_params = parse_qs(parsed_url.query)
-        query_params.pop('sayfa', None)
-        # Add the new 'sayfa' query parameter with the incremented page number
-        query_params['sayfa'] = current_page + 1
-        # Reconstruct the URL with the updated query parameters
-        new_query = urlencode(query_params, doseq=True)
-        next_page_url = urlunparse(parsed_url._replace(query=new_query))
-        
-        print(f"Navigating to next page: {next_page_url}")
-        self.driver.get(next_page_url)
-        time.sleep(2)
-        new_url = self.driver.current_url
-        print(f"Current URL: {new_url}")
-        if self.latest_url == new_url:
-            print("Next page URL is the same as current, terminating pagination.")
+            last_height = driver.execute_script("return document.body.scrollHeight")
+
+    def _card_links(self, driver: webdriver.Remote) -> list:
+        links = []
+        for grid in driver.find_elements(*self.plan.grid):
+            links.extend(grid.find_elements(By.XPATH, self.plan.product_link))
+        return links
+
+    def _has_next_page(self, driver: webdriver.Remote) -> Optional[bool]:
+        """Read the next-page control on a listing page; None if the market has no next_page selector."""
+        if self.plan.next_page is None:
+            return None
+        buttons = driver.find_elements(By.XPATH, self.plan.next_page)
+        if not buttons:
             return False
-        self.latest_url = new_url
-        return True
+        button = buttons[0]
+        disabled = (button.get_dom_attribute('disabled') is not None
+                    or button.get_dom_attribute('aria-disabled') == 'true'
+                    or 'disabled' in (button.get_dom_attribute('class') or ''))
+        return not disabled
+
+    def _pagination_count(self, driver: webdriver.Remote, xpath: Optional[str]) -> Optional[int]:
+        if xpath is None:
+            return None
+        elements = driver.find_elements(By.XPATH, xpath)
+        return parse_count(elements[0].text) if elements else None
+
+    def _collect_listing(self, session: DriverSession, base_url: str, page: int,
+                         expected_cards: Optional[int] = None) -> ListingPage:
+        driver = session.driver
+        url = page_url(base_url, page, self.config.pagination.get('page_param', 'sayfa'))
+        seconds = self._load(url, session, 'listing', record=False)
+        ready = self._wait_for_listing(driver)
+        self.rate_limiter.record(url, seconds, ok=ready)
+        if not ready:
+            # Raised so the page is retried with backoff; only a grid without cards ends the category
+            raise PageNotReadyError(f"Timed out waiting for the product grid on {url}")
+        with self.metrics.timer('scroll', **self._tags()):
+            self.scroll_page(driver, expected_cards)
+
+        listing = ListingPage(page=page, url=driver.current_url)
+        links = self._card_links(driver)
+        print(f"Found {len(links)} product links on page {page}")
+        card_links = []
+        # Ensure URLs are absolute and valid
+        for link in links:
+            if link.is_displayed():
+                href = link.get_dom_attribute('href')
+                if href:
+                    # Convert relative URLs to absolute
+                    absolute_url = urljoin(base_url, href)
+                    # Validate URL
+                    try:
+                        parsed = urlparse(absolute_url)
+                        if all([parsed.scheme, parsed.netloc]):
+                            listing.hrefs.append(absolute_url)
+                            listing.card_prices[absolute_url] = self._card_price(link)
+                            card_links.append((absolute_url, link))
+                    except Exception as e:
+                        print(f"Invalid URL: {absolute_url}, Error: {e}")
+
+        if self.product_index is not None and self.plan.card_price is None and card_links:
+            # One round trip for the whole page instead of one per card
+            texts = driver.execute_script(CARD_TEXT_SCRIPT, [link for _, link in card_links])
+            listing.card_hashes = {url: content_hash(text) for (url, _), text in zip(card_links, texts)}
+
+        # Decide now whether there is a next page, while the listing is still loaded
+        listing.has_next = self._has_next_page(driver)
+        if page == 1:
+            listing.total_products = self._pagination_count(driver, self.plan.total_count)
+            listing.total_pages = self._pagination_count(driver, self.plan.total_pages)
+        return listing
 
-    def scrape_category(self, category_data: Dict[str, Dict[str, str]], category_name: str) -> None:
+    def _collect_pooled_listing(self, base_url: str, page: int, expected_cards: Optional[int]) -> ListingPage:
+        with self.pool.lease() as session:
+            return self._collect_listing(session, base_url, page, expected_cards)
+
+    def _prefetch_listings(self, base_url: str, plan: PaginationPlan, current_page: int) -> Dict[int, ListingPage]:
+        """Load every remaining listing page of a category concurrently when its page count is known."""
+        if self.pool is None or plan.total_pages is None or plan.total_pages <= current_page:
+            return {}
+        pages = range(current_page + 1, plan.total_pages + 1)
+        print(f"Prefetching listing pages {pages.start}-{pages.stop - 1} on {self.pool.size} workers")
+        with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+            futures = {page: executor.submit(self._collect_pooled_listing, base_url, page, plan.expected_cards(page))
+                       for page in pages}
+        prefetched = {}
+        for page, future in futures.items():
+            try:
+                prefetched[page] = future.result()
+            except Exception as e:
+                # The page is simply loaded again on the main driver when its turn comes
+                print(f"Error prefetching listing page {page}: {e}")
+        return prefetched
+
+    def scrape_category(self, category_data: Dict[str, Dict[str, str]], category_name: str,
+                        checkpoint_key: Optional[str] = None) -> bool:
+        """Scrape one category; False when it stopped on an error.
+
+        ``checkpoint_key`` identifies the category in the resume checkpoint and
+        defaults to its name; tree walks pass the full path, since names repeat.
+        """
         if 'urls' not in category_data or self.config.name not in category_data['urls']:
             print(f"Store '{self.config.name}' not found for category '{category_name}'.")
-            return
+            return True
     
         base_url = category_data['urls'][self.config.name]
-        self.latest_url = base_url
-        current_page = 1
+        self._category = category_name
+        self._checkpoint_key = checkpoint_key or category_name
+        resume_state = self.checkpoint.get(self._checkpoint_key) if self.resume else None
+        if resume_state and resume_state.get('completed'):
+            print(f"Category '{category_name}' was completed by the interrupted run, skipping.")
+            return True
+        current_page = resume_state['page'] if resume_state else 1
+        first_product = resume_state['next_product'] if resume_state else 0
         print(f"Processing category '{category_name}' with URL: {base_url}")
+        self._open_output(category_name, resume_state)
+        self.session.acquire()
+        # One executor for the whole category: the pool keeps working on earlier pages'
+        # products while the main driver loads and scrolls the next listing page
+        executor = ThreadPoolExecutor(max_workers=self.pool.size) if self.pool is not None else None
+        progress = CategoryProgress(next_page=current_page)
         
         try:
+            plan = PaginationPlan(page_size=self.config.pagination.get('page_size'))
+            prefetched = {}
+            previous_url = None
             while True:
-                self.driver.get(f"{base_url}?sayfa={current_page}")
-                time.sleep(2)
-                
-                self.scroll_page()
+                listing = prefetched.pop(current_page, None) or self._with_retries(
+                    base_url, partial(self._collect_listing, self.session, base_url, current_page,
+                                      plan.expected_cards(current_page)))
+                if listing.url == previous_url:
+                    print("Listing page URL is the same as the previous one, terminating pagination.")
+                    break
+                previous_url = listing.url
+                hrefs = listing.hrefs
+                if not hrefs:
+                    print("No products found")
+                    break
+
+                if current_page == 1:
+                    plan = PaginationPlan.from_first_page(listing, plan.page_size)
+                    if plan.total_pages is not None:
+                        print(f"Category has {plan.total_pages} pages of up to {plan.page_size} products")
+                    prefetched = self._prefetch_listings(base_url, plan, current_page)
                 
-                try:
-                    if self.config.name == "migros":
-                        grids = self.driver.find_elements(By.XPATH, 
-                            "//div[contains(@class, 'mdc-layout-grid__inner product-cards list ng-star-inserted')]")
-                    else:
-                        grids = self.driver.find_elements(By.CLASS_NAME, self.config.grid_class)
-                    
-                    if not grids:
-                        print("No grids found")
-                        break
-                    else: 
-                        print(f"Found {len(grids)} grids")
-                    
-                    hrefs = []
-                    for grid in grids:
-                        if self.config.name == "migros":
-                            links = grid.find_elements(By.XPATH, ".//a[@href and @id='product-name']")
-                        else:
-                            links = grid.find_elements(By.XPATH, ".//a[@href]")
-                        
-                        # Ensure URLs are absolute and valid
-                        for link in links:
-                            if link.is_displayed():
-                                href = link.get_dom_attribute('href')
-                                if href:
-                                    # Convert relative URLs to absolute
-                                    absolute_url = urljoin(base_url, href)
-                                    # Validate URL
-                                    try:
-                                        parsed = urlparse(absolute_url)
-                                        if all([parsed.scheme, parsed.netloc]):
-                                            hrefs.append(absolute_url)
-                                    except Exception as e:
-                                        print(f"Invalid URL: {absolute_url}, Error: {e}")
-                    
-                    print(f"Found {len(hrefs)} valid product URLs")
-                    
-                    for href_index, href in enumerate(hrefs):
-                        try:
-                            print(f"Processing product {href_index + 1}/{len(hrefs)} in {category_name}")
-                            print(f"URL: {href}")
-                            self.driver.get(href)
-                            time.sleep(2)
-                            self.extract_element_info(category_name)
-                        except InvalidArgumentException as e:
-                            print(f"Invalid URL: {href}")
-                            print(f"Error: {e}")
-                            continue
-                        except Exception as e:
-                            print(f"Error processing {href}: {e}")
-                            continue
-    
-                    # Check for next page and continue scraping
-                    if not self.go_to_next_page(base_url, current_page):
-                        break
-                    current_page += 1
-                    
-                except NoSuchElementException:
-                    print("No grid found")
+                print(f"Found {len(hrefs)} valid product URLs")
+                # Products are numbered by their position on the listing page so a resumed
+                # run can skip the ones the interrupted run already wrote
+                pending = list(enumerate(hrefs))[first_product:]
+                first_product = 0
+                if self.product_index is not None:
+                    selected = set(self.product_index.select(self.config.name, [href for _, href in pending],
+                                                             listing.card_prices, listing.card_hashes))
+                    self._card_hashes.update((canonical_url(href), listing.card_hashes.get(href)) for href in selected)
+                    pending = [(href_index, href) for href_index, href in pending if href in selected]
+                    print(f"{len(pending)} of them are new or changed")
+                self._process_products(executor, progress, pending, len(hrefs), category_name, current_page)
+
+                # Stop on the last page instead of loading one more page to find out
+                is_last = plan.is_last(current_page)
+                if is_last is None:
+                    # Unknown without next_page or a total count: the next, empty page ends the loop
+                    is_last = listing.has_next is False
+                if is_last:
                     break
-                    
+                current_page += 1
+                self._save_checkpoint(*progress.resume_point())
+
+            self._finish_products(progress, category_name, wait=True)
             self._save_results()
+            return True
             
         except Exception as e:
             print(f"Error scraping category {category_name}: {e}")
+            return False
         finally:
-            self.driver.quit()
+            if executor is not None:
+                # Products not started yet stay unfinished in the checkpoint for --resume
+                executor.shutdown(wait=True, cancel_futures=True)
+            # Whatever was extracted is already on disk; a crash leaves the checkpoint for --resume
+            self.sink.close()
+
+    def _card_price(self, link) -> Optional[str]:
+        """Price shown on the listing card, read through the optional "card_price" selector
+        which is evaluated relative to the product link."""
+        if self.product_index is None or self.plan.card_price is None:
+            return None
+        elements = link.find_elements(By.XPATH, self.plan.card_price)
+        return elements[0].text.strip() if elements else None
+
+    def _with_retries(self, url: str, action):
+        """Run ``action``, retrying transient failures with jittered exponential backoff."""
+        for attempt in range(1, self.retry_policy.attempts + 1):
+            try:
+                return action()
+            except (InvalidArgumentException, CircuitOpenError):
+                raise  # Retrying cannot help
+            except Exception as e:
+                # A selector that matched nothing on a ready page fails the same way every time
+                if attempt == self.retry_policy.attempts or not is_transient(e):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                self.metrics.increment('retries', **self._tags())
+                print(f"Attempt {attempt} for {url} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _fetch_product(self, session: DriverSession, href: str, category_name: str) -> None:
+        if self.http_fetcher is not None and self._extract_over_http(href, category_name):
+            return
+        # driver.get does not fail on a 429 or a block page; those only show up as a page
+        # without product details, so the limiter hears about the load once it has been read
+        seconds = self._load(href, session, record=False)
+        try:
+            if not self._wait_for_product(session.driver):
+                raise PageNotReadyError(f"Timed out waiting for product details on {href}")
+            self.extract_element_info(category_name, session.driver)
+        except Exception as e:
+            # Missing selectors on a ready page are a config problem, not the host throttling
+            self.rate_limiter.record(href, seconds, ok=not is_transient(e))
+            raise
+        self.rate_limiter.record(href, seconds, ok=True)
+
+    def _process_product(self, session: DriverSession, href: str, href_index: int, total: int,
+                         category_name: str) -> None:
+        try:
+            print(f"Processing product {href_index + 1}/{total} in {category_name}")
+            print(f"URL: {href}")
+            self._with_retries(href, partial(self._fetch_product, session, href, category_name))
+        except InvalidArgumentException as e:
+            print(f"Invalid URL: {href}")
+            print(f"Error: {e}")
+            self.dead_letters.add(href, category_name, str(e).strip(), 1)
+        except Exception as e:
+            self.metrics.increment('extraction_failures', **self._tags(stage='product'))
+            print(f"Error processing {href}: {e}")
+            attempts = self.retry_policy.attempts if is_transient(e) else 1
+            self.dead_letters.add(href, category_name, str(e).strip(), attempts)
+            self.metrics.increment('dead_letters', **self._tags())
+
+    def _process_pooled_product(self, href: str, href_index: int, total: int, category_name: str) -> None:
+        with self.pool.lease() as session:
+            self._process_product(session, href, href_index, total, category_name)
+
+    def _process_products(self, executor: Optional[ThreadPoolExecutor], progress: CategoryProgress,
+                          pending: List[Tuple[int, str]], total: int, category_name: str, current_page: int) -> None:
+        """Process one listing page's products inline, or hand them to the pool without waiting."""
+        progress.in_flight.update((current_page, href_index) for href_index, _ in pending)
+        progress.next_page = current_page + 1
+        if executor is None:
+            for href_index, href in pending:
+                self._process_product(self.session, href, href_index, total, category_name)
+                self._product_done(progress, (current_page, href_index), category_name)
+            return
+
+        # Listing pages stay on the main driver, product pages fan out over the pool
+        for href_index, href in pending:
+            future = executor.submit(self._process_pooled_product, href, href_index, total, category_name)
+            progress.futures[future] = (current_page, href_index)
+        self._finish_products(progress, category_name, wait=False)
+
+    def _finish_products(self, progress: CategoryProgress, category_name: str, wait: bool) -> None:
+        """Account for pooled products that are done; with ``wait``, for all of them."""
+        futures = as_completed(list(progress.futures)) if wait else [f for f in progress.futures if f.done()]
+        for future in futures:
+            future.result()
+            self._product_done(progress, progress.futures.pop(future), category_name)
+
+    def _product_done(self, progress: CategoryProgress, key: Tuple[int, int], category_name: str) -> None:
+        progress.in_flight.discard(key)
+        progress.finished += 1
+        if progress.finished % self.fsync_every == 0:
+            # Everything before the first unfinished product is written and can be skipped on resume
+            self._save_checkpoint(*progress.resume_point())
+
+    def _open_output(self, category_name: str, resume_state: Optional[Dict[str, object]]) -> None:
+        output_directory = os.path.join("marketplace", self.config.name)
+        if not os.path.exists(output_directory):
+            os.makedirs(output_directory)
+        if resume_state:
+            output_path = resume_state['output']
+            print(f"Resuming '{category_name}' at page {resume_state['page']}, "
+                  f"product {resume_state['next_product'] + 1} into {output_path}")
+        else:
+            timestamp = time.strftime('%Y%m%d_%H%M%S', time.localtime())
+            output_path = os.path.join(output_directory, f"{self.config.output_file}_{timestamp}.{self.output_format}")
+            self.checkpoint.update(self._checkpoint_key, output=output_path, page=1, next_product=0,
+                                   completed=False)
+        self.sink = open_sink(output_path, self.output_format, fsync_every=self.fsync_every,
+                              resume=bool(resume_state))
+
+    def _save_checkpoint(self, page: int, next_product: int) -> None:
+        # Rows must be durable before the checkpoint claims them
+        self.sink.sync()
+        self.checkpoint.update(self._checkpoint_key, page=page, next_product=next_product)
 
     def scrape(self, chosen_category: str, subcategory_path: Optional[List[str]] = None) -> None:
-        def recursive_scrape(category_data, category_name):
-            self.scrape_category(category_data, category_name)
-            if 'subcategories' in category_data:
-                for subcategory_name, subcategory_data in category_data['subcategories'].items():
-                    print(f"Processing subcategory: {subcategory_name}")
-                    recursive_scrape(subcategory_data, subcategory_name)
-
-        if chosen_category not in self.category_mapper['categories']:
+        if self.category_index.get([chosen_category]) is None:
             print(f"Category '{chosen_category}' not found in category mapper.")
             return
 
-        category_data = self.category_mapper['categories'][chosen_category]
+        # The whole path is a single lookup in the flattened index
+        path = [chosen_category] + list(subcategory_path or [])
+        if self.category_index.get(path) is None:
+            missing = next(name for depth, name in enumerate(path)
+                           if self.category_index.get(path[:depth + 1]) is None)
+            print(f"Subcategory '{missing}' not found under category '{chosen_category}'.")
+            return
 
-        # Navigate through the subcategory path if provided
-        if subcategory_path:
-            for subcategory in subcategory_path:
-                if 'subcategories' in category_data and subcategory in category_data['subcategories']:
-                    category_data = category_data['subcategories'][subcategory]
+        if not self.resume:
+            # A fresh run must not inherit progress from an older interrupted one
+            self.checkpoint.clear()
+        try:
+            finished = True
+            for node in self.category_index.walk(path):
+                # The starting node keeps the top-level category's name, as before
+                if node.path == path:
+                    category_name = chosen_category
                 else:
-                    print(f"Subcategory '{subcategory}' not found under category '{chosen_category}'.")
-                    return
+                    category_name = node.name
+                    print(f"Processing subcategory: {category_name}")
+                # Names repeat across branches, so progress is keyed by the full path
+                finished = self.scrape_category({'urls': node.urls}, category_name, path_key(node.path)) and finished
+            if finished:
+                # The whole tree is done, nothing left to resume
+                self.checkpoint.clear()
+            else:
+                print(f"Some categories stopped on errors; {self.checkpoint.path} is kept for --resume.")
+        finally:
+            # The session outlives every category and is torn down once here
+            self.close()
 
-        recursive_scrape(category_data, chosen_category)
+    def retry_dead_letters(self) -> None:
+        """Re-run only the product URLs that failed for good in earlier runs."""
+        entries = self.dead_letters.entries()
+        if not entries:
+            print(f"No dead letters in {self.dead_letters.path}.")
+            self.close()
+            return
+        # URLs that fail again go to a fresh log that replaces this one only after every
+        # entry was retried, so a retry that dies part way loses nothing
+        dead_letters = self.dead_letters
+        self.dead_letters = DeadLetterLog(dead_letters.path + '.retry')
+        self.dead_letters.clear()
+        # The retry keeps its own checkpoint so an interrupted tree walk stays resumable
+        self.checkpoint = RunCheckpoint(os.path.splitext(dead_letters.path)[0] + '.checkpoint.json')
+        self.checkpoint.clear()
+        category_name = 'dead_letters'
+        self._category = category_name
+        self._checkpoint_key = category_name
+        self._open_output(category_name, None)
+        try:
+            self.session.acquire()
+            pending = [(index, entry['url']) for index, entry in enumerate(entries)]
+            print(f"Retrying {len(pending)} dead-lettered product(s)")
+            # Rows keep the category the product was originally scraped under
+            for href_index, href in pending:
+                self._process_product(self.session, href, href_index, len(pending), entries[href_index]['category'])
+            dead_letters.replace_with(self.dead_letters)
+            self.dead_letters = dead_letters
+            self._save_results()
+            self.checkpoint.clear()
+        finally:
+            self.sink.close()
+            self.close()
 
     def _save_results(self) -> None:
-        timestamp = time.strftime('%Y%m%d_%H%M%S', time.localtime())
-        output_directory = os.path.join("marketplace", self.config.name)
-        if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
-        
-        output_file_with_timestamp = os.path.join(output_directory, f"{self.config.output_file}_{timestamp}.csv")
-        df = pd.DataFrame(self.elements_info)
-        
-        # Remove duplicated rows
-        df = df.drop_duplicates()
-        
-        df.to_csv(output_file_with_timestamp, index=False, encoding='utf-8-sig')
-        print(f"Results saved to {output_file_with_timestamp}")
-        
-        # Run text_splitter.py with the marketplace directory
-        subprocess.run(["python", "text_splitter.py", output_file_with_timestamp, output_directory])
+        self.sink.close()
+        self.checkpoint.update(self._checkpoint_key, completed=True)
+        output_file_with_timestamp = self.sink.path
+        if not self.sink.rows_written and not self.resume:
+            os.remove(output_file_with_timestamp)
+            print("No products extracted, nothing to save.")
+            return
+
+        print(f"Results saved to {output_file_with_timestamp} "
+              f"({self.sink.rows_written} rows, {self.sink.duplicates} duplicates dropped)")
+
+        processed_file = output_file_with_timestamp
+        self.saved_files.append(processed_file)
+        if self.postprocess == 'subprocess':
+            if self.output_format != 'csv':
+                print("text_splitter.py only reads CSV files, skipping post-processing.")
+                return
+            # Run text_splitter.py with the marketplace directory
+            output_directory = os.path.dirname(output_file_with_timestamp)
+            subprocess.run(["python", "text_splitter.py", output_file_with_timestamp, output_directory])
+            processed_file = output_file_with_timestamp.replace('.csv', '_updated.csv')
+            self.saved_files[-1] = processed_file
+
+        if self.parquet_root:
+            # Imported lazily so CSV-only runs do not need pyarrow
+            from columnar_store import write_partitioned
+            rows = write_partitioned(read_results(processed_file), self.parquet_root)
+            print(f"Appended {rows} rows to the Parquet dataset in {self.parquet_root}")
 
 def load_config(file_path: str) -> ScraperConfig:
     with open(file_path, 'r') as file:
@@ -320,33 +902,97 @@ def load_config(file_path: str) -> ScraperConfig:
 
 def load_category_mapper(file_path: str) -> Dict[str, Dict[str, str]]:
     with open(file_path, 'r') as file:
-        return json.load(file)
+        return normalize_mapper(json.load(file))
+
+# Built once; normalize_string runs for every product name when matching across markets
+TURKISH_CHARACTERS = str.maketrans({
+    'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u',
+    'Ç': 'C', 'Ğ': 'G', 'İ': 'I', 'Ö': 'O', 'Ş': 'S', 'Ü': 'U'
+})
 
 def normalize_string(input_str: str) -> str:
-    replacements = {
-        'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u',
-        'Ç': 'C', 'Ğ': 'G', 'İ': 'I', 'Ö': 'O', 'Ş': 'S', 'Ü': 'U'
-    }
-    for turkish_char, english_char in replacements.items():
-        input_str = input_str.replace(turkish_char, english_char)
-    return input_str.lower()
+    return input_str.translate(TURKISH_CHARACTERS).lower()
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        usage="python data_scraper.py <category> <marketplace> <browser> [<subcategory1> <subcategory2> ...] [options]")
+    parser.add_argument('category')
+    parser.add_argument('marketplace')
+    parser.add_argument('browser', help="chrome, firefox or edge; 'default' uses the market config's browser")
+    parser.add_argument('subcategories', nargs='*')
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of headless browsers that load product pages in parallel")
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help="Ceiling for the adaptive per-host request rate (default 10 per second, 0 disables limiting)")
+    parser.add_argument('--headless', action='store_true', help="Run the listing page browser headless too")
+    parser.add_argument('--fetch-backend', choices=['webdriver', 'http'], default='webdriver',
+                        help="'http' reads product pages from the server HTML and only uses the browser when a selector misses")
+    parser.add_argument('--extraction', choices=['elements', 'batch'], default='elements',
+                        help="'batch' reads every field of a product page in a single execute_script round trip")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only visit product pages that are new or whose listing price changed since the last run")
+    parser.add_argument('--index-path', default=os.path.join('marketplace', 'product_index.sqlite'),
+                        help="SQLite file holding the seen-product index for --incremental")
+    parser.add_argument('--max-age-days', type=float, default=7,
+                        help="Re-fetch unchanged products after this many days (0 disables)")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], default='csv',
+                        help="Format rows are streamed to while scraping")
+    parser.add_argument('--fsync-every', type=int, default=20,
+                        help="Flush results and the resume checkpoint to disk every N products")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted run from its last checkpoint")
+    parser.add_argument('--postprocess', choices=['inline', 'subprocess'], default='inline',
+                        help="'inline' writes one enriched file; 'subprocess' runs text_splitter.py on the raw file")
+    parser.add_argument('--parquet-root', nargs='?', const=os.path.join('marketplace', 'parquet'), default=None,
+                        help="Also store results in a Parquet dataset partitioned by market and scrape date")
+    parser.add_argument('--mapper', default='subcategory_mapper.json',
+                        help="Category mapper file; category_mapper.json holds the top-level URLs of every market")
+    parser.add_argument('--manifest', default=None,
+                        help="Write the market, category and result files of this run to this JSON file")
+    parser.add_argument('--retries', type=int, default=3,
+                        help="Attempts per page before a product URL is written to the dead-letter file")
+    parser.add_argument('--retry-dead-letters', action='store_true',
+                        help="Only re-run the product URLs that failed in earlier runs of this market")
+    parser.add_argument('--metrics-dir', default=os.path.join('marketplace', 'metrics'),
+                        help="Directory for the run's JSON metrics summary and <market>.prom Prometheus text file")
+    return parser.parse_args(argv)
 
 # Usage example
 if __name__ == "__main__":
-    if len(sys.argv) < 4:
-        print("Usage: python data_scraper.py <category> <marketplace> <browser> [<subcategory1> <subcategory2> ...]")
-        sys.exit(1)
-    
-    category = sys.argv[1]
-    marketplace = sys.argv[2]
-    browser = sys.argv[3].lower()
-    subcategory_path = [sub for sub in sys.argv[4:]] if len(sys.argv) > 4 else None
+    args = parse_args(sys.argv[1:])
+
+    category = args.category
+    marketplace = args.marketplace
+    browser = None if args.browser.lower() == 'default' else args.browser.lower()
+    subcategory_path = args.subcategories or None
 
     config_file_path = f'{marketplace}_config.json'  # Config file path based on marketplace
-    category_mapper_file_path = 'subcategory_mapper.json'  # Path to the category mapper file
+    category_mapper_file_path = args.mapper  # Path to the category mapper file
 
     config = load_config(config_file_path)
-    category_mapper = load_category_mapper(category_mapper_file_path)
-    scraper = WebScraper(config, category_mapper, browser)  # Pass browser to WebScraper
+    # The flattened index is cached on disk, so the mapper JSON is only parsed when it changes
+    category_index = CategoryIndex.load(category_mapper_file_path)
+    product_index = None
+    if args.incremental:
+        if 'card_price' not in config.selectors:
+            print(f"{marketplace}_config.json has no 'card_price' selector; --incremental compares "
+                  f"the text of each listing card instead.")
+        os.makedirs(os.path.dirname(args.index_path) or '.', exist_ok=True)
+        product_index = ProductIndex(args.index_path, max_age_days=args.max_age_days)
+    scraper = WebScraper(config, None, browser, workers=args.workers,
+                         rate_limit=args.rate_limit, headless=args.headless, fetch_backend=args.fetch_backend,
+                         extraction_mode=args.extraction, product_index=product_index,
+                         output_format=args.output_format, fsync_every=args.fsync_every, resume=args.resume,
+                         parquet_root=args.parquet_root, postprocess=args.postprocess,
+                         metrics_dir=args.metrics_dir, retries=args.retries,
+                         category_index=category_index)
+
+    if args.retry_dead_letters:
+        scraper.retry_dead_letters()
+    else:
+        scraper.scrape(category, subcategory_path)
 
-    scraper.scrape(category, subcategory_path)
\ No newline at end of file
+    if args.manifest:
+        # Read by fan_out.py to find the files a market run produced
+        with open(args.manifest, 'w', encoding='utf-8') as file:
+            json.dump({'market': config.name, 'category': category, 'files': scraper.saved_files}, file)
\ No newline at end of file
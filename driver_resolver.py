@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.driver_cache import DriverCacheManager
+from webdriver_manager.firefox import GeckoDriverManager
+from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
+CACHE_DIR = os.environ.get('AKTUEL_DRIVER_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'aktuel-market', 'drivers'))
+MANIFEST_PATH = os.path.join(CACHE_DIR, 'manifest.json')
+# webdriver-manager is asked for a newer driver at most this often
+CHECK_INTERVAL_SECONDS = 24 * 60 * 60
+
+ENV_VARS = {
+    'chrome': 'CHROMEDRIVER_PATH',
+    'firefox': 'GECKODRIVER_PATH',
+    'edge': 'EDGEDRIVER_PATH',
+}
+
+_resolved: Dict[str, str] = {}
+_lock = threading.Lock()
+# Seconds spent resolving driver binaries in this process, for startup reporting
+resolution_seconds = 0.0
+
+
+def _manager(browser: str, version: Optional[str]):
+    cache_manager = DriverCacheManager(root_dir=CACHE_DIR)
+    if browser == 'chrome':
+        return ChromeDriverManager(driver_version=version, cache_manager=cache_manager)
+    if browser == 'firefox':
+        return GeckoDriverManager(version=version, cache_manager=cache_manager)
+    if browser == 'edge':
+        return EdgeChromiumDriverManager(version=version, cache_manager=cache_manager)
+    raise ValueError(f"Unsupported browser: {browser}")
+
+
+def _read_manifest() -> Dict[str, Dict[str, object]]:
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest: Dict[str, Dict[str, object]]) -> None:
+    """Atomically replace the manifest; several scrapers may start at once, so each writes its own temp file."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=CACHE_DIR, prefix='manifest.', suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file, indent=2)
+            os.replace(temporary_path, MANIFEST_PATH)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+    except OSError as e:
+        # The manifest only saves a network check next time
+        print(f"Could not update the driver manifest {MANIFEST_PATH}: {e}")
+
+
+def _resolve(browser: str, explicit_path: Optional[str], version: Optional[str]) -> str:
+    # An explicit binary always wins and never touches the network
+    for candidate, source in ((explicit_path, 'config'), (os.environ.get(ENV_VARS[browser]), ENV_VARS[browser])):
+        if candidate:
+            if not os.path.isfile(candidate):
+                raise FileNotFoundError(f"Driver binary from {source} does not exist: {candidate}")
+            return candidate
+
+    key = f"{browser}@{version}" if version else browser
+    manifest = _read_manifest()
+    entry = manifest.get(key)
+    cached_path = entry['path'] if entry and os.path.isfile(entry['path']) else None
+    if cached_path and time.time() - entry['checked_at'] < CHECK_INTERVAL_SECONDS:
+        return cached_path
+
+    try:
+        path = _manager(browser, version).install()
+    except Exception as e:
+        if cached_path:
+            print(f"Could not check for a newer {browser} driver ({e}), using the cached one offline.")
+            # A failed check counts as a check, or every start would probe the network again
+            manifest[key] = {**entry, 'checked_at': time.time()}
+            _write_manifest(manifest)
+            return cached_path
+        raise
+    manifest[key] = {'path': path, 'checked_at': time.time(), 'version': version}
+    _write_manifest(manifest)
+    return path
+
+
+def resolve_driver_path(browser: str, explicit_path: Optional[str] = None, version: Optional[str] = None) -> str:
+    """Path of the WebDriver binary for ``browser``.
+
+    Order: explicit path (config), ``<BROWSER>DRIVER_PATH`` environment variable,
+    the local cache when it was checked within a day, then webdriver-manager.
+    If webdriver-manager fails (e.g. offline) an older cached binary is used.
+    The result is memoized for the process, so pools resolve once.
+    """
+    global resolution_seconds
+    browser = browser.lower()
+    if browser not in ENV_VARS:
+        raise ValueError(f"Unsupported browser: {browser}")
+    with _lock:
+        memo_key = f"{browser}|{explicit_path}|{version}"
+        if memo_key not in _resolved:
+            started = time.perf_counter()
+            _resolved[memo_key] = _resolve(browser, explicit_path, version)
+            resolution_seconds += time.perf_counter() - started
+        return _resolved[memo_key]
@@ -0,0 +1,123 @@
+import queue
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+
+
+class DriverSession:
+    """Keeps a single WebDriver alive for a whole category tree walk.
+
+    The driver is started lazily, health-checked whenever a caller asks for it
+    through ``acquire`` and restarted if the browser or driver process died.
+    """
+
+    def __init__(self, factory: Callable[[], WebDriver]):
+        self._factory = factory
+        self._driver: Optional[WebDriver] = None
+        self.starts = 0
+        self.restarts = 0
+        self.reuses = 0
+        self.startup_seconds = 0.0
+
+    @property
+    def driver(self) -> WebDriver:
+        if self._driver is None:
+            self._start()
+        return self._driver
+
+    def _start(self) -> None:
+        started = time.perf_counter()
+        self._driver = self._factory()
+        self.startup_seconds += time.perf_counter() - started
+        self.starts += 1
+
+    def _discard(self) -> None:
+        if self._driver is None:
+            return
+        try:
+            self._driver.quit()
+        except Exception:
+            pass  # The process is most likely gone already
+        self._driver = None
+
+    def is_alive(self) -> bool:
+        if self._driver is None:
+            return False
+        try:
+            # Any command works; current_url is the cheapest round trip
+            self._driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def acquire(self) -> WebDriver:
+        """Return a live driver, reusing the current one when it still responds."""
+        if self._driver is not None and not self.is_alive():
+            print("WebDriver stopped responding, restarting it.")
+            self._discard()
+            self.restarts += 1
+        if self._driver is None:
+            self._start()
+        else:
+            self.reuses += 1
+        return self._driver
+
+    def restart(self) -> WebDriver:
+        self._discard()
+        self.restarts += 1
+        self._start()
+        return self._driver
+
+    def quit(self) -> None:
+        self._discard()
+
+    @property
+    def average_startup_seconds(self) -> float:
+        return self.startup_seconds / self.starts if self.starts else 0.0
+
+    def summary(self) -> str:
+        saved = self.reuses * self.average_startup_seconds
+        return (f"Driver session: {self.starts} start(s), {self.restarts} restart(s), "
+                f"{self.reuses} reuse(s), {self.startup_seconds:.1f}s spent starting, "
+                f"~{saved:.1f}s of startup saved")
+
+
+class DriverPool:
+    """A fixed number of DriverSessions shared by worker threads.
+
+    Workers borrow a session with ``lease`` and hand it back when done, so each
+    browser is only ever driven by one thread at a time.
+    """
+
+    def __init__(self, factory: Callable[[], WebDriver], size: int):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        self.sessions = [DriverSession(factory) for _ in range(size)]
+        self._idle: "queue.Queue[DriverSession]" = queue.Queue()
+        for session in self.sessions:
+            self._idle.put(session)
+
+    @property
+    def size(self) -> int:
+        return len(self.sessions)
+
+    @contextmanager
+    def lease(self) -> Iterator[DriverSession]:
+        session = self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def quit(self) -> None:
+        for session in self.sessions:
+            session.quit()
+
+    def summary(self) -> str:
+        starts = sum(session.starts for session in self.sessions)
+        restarts = sum(session.restarts for session in self.sessions)
+        startup_seconds = sum(session.startup_seconds for session in self.sessions)
+        return (f"Driver pool: {self.size} worker(s), {starts} start(s), "
+                f"{restarts} restart(s), {startup_seconds:.1f}s spent starting")
@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+import pandas as pd
+from data_scraper import normalize_string
+from prices import parse_price
+from result_sink import read_results
+
+MARKETS = ['migros', 'a101', 'sok']
+DEFAULT_MAPPER = 'category_mapper.json'
+COMPARISON_DIRECTORY = os.path.join("marketplace", "comparison")
+
+
+def comparison_key(product_name: object) -> Optional[str]:
+    """'Coca-Cola  1 L' and 'coca-cola 1 l' share a key across markets."""
+    if not isinstance(product_name, str) or not product_name.strip():
+        return None
+    return re.sub(r'\s+', ' ', normalize_string(product_name)).strip()
+
+
+def shelf_price(row: pd.Series):
+    # The discounted price is what the shopper pays when there is one
+    return parse_price(row.get('İndirimli Fiyat')) or parse_price(row.get('Fiyat'))
+
+
+def _stream_output(market: str, process: subprocess.Popen) -> None:
+    for line in process.stdout:
+        print(f"[{market}] {line}", end='', flush=True)
+
+
+def run_markets(category: str, markets: List[str], browser: str, mapper: str,
+                scraper_args: List[str]) -> Dict[str, List[str]]:
+    """Scrape ``category`` in every market at once, one data_scraper.py process each.
+
+    Returns the result files of each market that finished; failed markets are reported and left out.
+    """
+    manifest_directory = tempfile.mkdtemp(prefix='fan_out_')
+    processes = {}
+    for market in markets:
+        manifest = os.path.join(manifest_directory, f"{market}.json")
+        command = [sys.executable, '-u', 'data_scraper.py', category, market, browser,
+                   '--mapper', mapper, '--manifest', manifest] + scraper_args
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, encoding='utf-8', errors='replace')
+        reader = threading.Thread(target=_stream_output, args=(market, process), daemon=True)
+        reader.start()
+        processes[market] = (process, reader, manifest)
+
+    result_files = {}
+    for market, (process, reader, manifest) in processes.items():
+        return_code = process.wait()
+        reader.join()
+        if return_code != 0 or not os.path.exists(manifest):
+            print(f"Scraper for '{market}' failed with exit code {return_code}.")
+            continue
+        with open(manifest, encoding='utf-8') as file:
+            result_files[market] = json.load(file)['files']
+    shutil.rmtree(manifest_directory, ignore_errors=True)
+    return result_files
+
+
+def merge_results(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """One row per normalized product name with each market's name, price and link side by side."""
+    per_market = []
+    for market, df in frames.items():
+        if df.empty:
+            continue
+        df = df.assign(**{'Ürün': df['Ürün Adı'].map(comparison_key)})
+        df = df.assign(price=df.apply(shelf_price, axis=1)).dropna(subset=['Ürün'])
+        # A product listed in two subcategories keeps its cheapest row
+        df = df.sort_values('price', na_position='last')
+        df = df.drop_duplicates('Ürün').set_index('Ürün')
+        per_market.append(pd.DataFrame({
+            f'{market} Ürün Adı': df['Ürün Adı'],
+            f'{market} Fiyat': df['price'],
+            f'{market} Kaynak': df['Kaynak'],
+        }))
+    if not per_market:
+        return pd.DataFrame()
+
+    merged = pd.concat(per_market, axis=1, join='outer')
+    price_columns = [column for column in merged.columns if column.endswith(' Fiyat')]
+    prices = merged[price_columns]
+    # A market lists the product when it has a row for it, even if no price could be read
+    source_columns = [column for column in merged.columns if column.endswith(' Kaynak')]
+    merged['Market Sayısı'] = merged[source_columns].notna().sum(axis=1)
+
+    def cheapest(row: pd.Series) -> Optional[str]:
+        available = {column[:-len(' Fiyat')]: price for column, price in row.dropna().items()}
+        return min(available, key=available.get) if available else None
+
+    merged['En Ucuz'] = prices.apply(cheapest, axis=1)
+    # Products sold by several chains are the comparable ones, list them first
+    merged = merged.sort_values(['Market Sayısı'], ascending=False, kind='stable')
+    return merged.reset_index().rename(columns={'index': 'Ürün'})
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Scrape one category in several markets in parallel and compare the results",
+        epilog="Options not listed here (e.g. --workers, --incremental) are passed on to data_scraper.py.")
+    parser.add_argument('category')
+    parser.add_argument('--markets', nargs='+', default=MARKETS, help="Markets to scrape")
+    parser.add_argument('--browser', default='default',
+                        help="chrome, firefox or edge; 'default' uses each market config's browser")
+    parser.add_argument('--mapper', default=DEFAULT_MAPPER, help="Category mapper with a URL per market")
+    args, scraper_args = parser.parse_known_args(argv)
+
+    started = time.perf_counter()
+    result_files = run_markets(args.category, args.markets, args.browser, args.mapper, scraper_args)
+    print(f"All markets finished in {time.perf_counter() - started:.1f}s")
+
+    frames = {market: pd.concat([read_results(path) for path in paths], ignore_index=True)
+              for market, paths in result_files.items() if paths}
+    comparison = merge_results(frames)
+    if comparison.empty:
+        print("No results to compare.")
+        return
+
+    os.makedirs(COMPARISON_DIRECTORY, exist_ok=True)
+    timestamp = time.strftime('%Y%m%d_%H%M%S', time.localtime())
+    output_path = os.path.join(COMPARISON_DIRECTORY, f"{normalize_string(args.category).replace(' ', '_')}_{timestamp}.csv")
+    comparison.to_csv(output_path, index=False, encoding='utf-8-sig')
+    print(f"Comparison of {len(comparison)} products across {', '.join(frames)} saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
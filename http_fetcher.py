@@ -0,0 +1,146 @@
+import threading
+from typing import Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+from selector_plan import SelectorPlan
+
+DEFAULT_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/124.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'tr-TR,tr;q=0.9,en;q=0.8',
+}
+
+
+# Statuses that mean the host is overloaded or throttling rather than that the page is missing
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SelectorMiss(Exception):
+    """A configured selector matched nothing in the server-rendered HTML."""
+
+
+class TransportError(Exception):
+    """The request failed (connection error, timeout, 429/5xx) before there was HTML to read."""
+
+
+class HttpFetcher:
+    """Fetches product pages over pooled keep-alive HTTP and runs the market's
+    selector plan against the raw HTML with lxml.
+
+    ``extract_fields`` returns None whenever a selector misses or the server
+    refuses the page outright (e.g. 404), which tells the caller to fall back to
+    the WebDriver path for that page. Throttling and connection failures raise
+    TransportError instead, so the caller can back off from the host.
+    """
+
+    def __init__(self, plan: SelectorPlan, pool_size: int = 10, timeout: float = 10):
+        self.plan = plan
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> lxml_html.HtmlElement:
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransportError(f"{type(e).__name__}: {e}") from e
+        if response.status_code in TRANSIENT_STATUSES:
+            raise TransportError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        parser = lxml_html.HTMLParser(encoding=self._encoding(response))
+        # Attributes are kept as served, like WebElement.get_dom_attribute
+        return lxml_html.fromstring(response.content, parser=parser, base_url=response.url)
+
+    @staticmethod
+    def _encoding(response: requests.Response) -> str:
+        """The charset from Content-Type, else UTF-8 when the body decodes as it, else a detected one.
+
+        Left to itself lxml falls back to Latin-1 on pages without a meta charset
+        and turns "Süt" into "SÃ¼t".
+        """
+        if 'charset=' in response.headers.get('Content-Type', '').lower():
+            return response.encoding
+        try:
+            response.content.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return response.apparent_encoding or 'utf-8'
+
+    @staticmethod
+    def _text(node) -> str:
+        # Mirror WebElement.text closely enough: collapse whitespace, drop edges
+        text = node.text_content() if hasattr(node, 'text_content') else str(node)
+        return " ".join(text.split())
+
+    def _first(self, document, field: str, required: bool = True):
+        """First node matched by the field's XPaths, tried in plan order; None if it is not configured."""
+        if not self.plan.has(field):
+            return None
+        for xpath in self.plan.xpaths(field):
+            nodes = document.xpath(xpath)
+            if nodes:
+                return nodes[0]
+        if required:
+            raise SelectorMiss(field)
+        return None
+
+    def _descriptions(self, document) -> List[Dict[str, object]]:
+        tabs = document.xpath(self.plan.description_tabs)
+        panels = document.xpath(self.plan.description)
+        contents = [self._text(panel) for panel in panels]
+        # Only the active tab is rendered server-side on most sites; a partial set
+        # would silently drop sections, so it counts as a miss
+        if len(contents) != len(tabs) or not all(contents):
+            raise SelectorMiss('description')
+        return [{'Tab Index': tab_index, 'Tab Name': self._text(tab) or "-", 'Content': content}
+                for tab_index, (tab, content) in enumerate(zip(tabs, contents))]
+
+    def extract_fields(self, url: str) -> Optional[Dict[str, object]]:
+        try:
+            document = self.fetch(url)
+            image = self._first(document, 'image')
+            product_name = self._first(document, 'product_name')
+            brand = self._first(document, 'brand')
+            current_price = self._first(document, 'current_price')
+            old_price = self._first(document, 'old_price', required=False)
+            fields = {
+                'image': image.get('src') if image is not None else None,
+                'product_name': self._text(product_name),
+                'brand': self._text(brand) if brand is not None else "-",
+                'current_price': self._text(current_price),
+                'old_price': self._text(old_price) if old_price is not None else "-",
+                'descriptions': self._descriptions(document) if self.plan.description_tabs else None,
+                'url': document.base_url or url,
+            }
+        except (requests.RequestException, SelectorMiss) as e:
+            print(f"HTTP fetch fell back to the browser for {url}: {e!r}")
+            self._count(hit=False)
+            return None
+        except TransportError:
+            self._count(hit=False)
+            raise
+        self._count(hit=True)
+        return fields
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        share = self.hits / total * 100 if total else 0.0
+        return f"HTTP fetch: {self.hits}/{total} product pages served without a browser ({share:.0f}%)"
+
+    def close(self) -> None:
+        self.session.close()
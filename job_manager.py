@@ -0,0 +1,133 @@
+import itertools
+import os
+import queue
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Lines data_scraper.py prints that progress is derived from
+FOUND_PATTERN = re.compile(r'^Found (\d+) valid product URLs')
+PRODUCT_PATTERN = re.compile(r'^Processing product \d+/\d+')
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'Sırada', 'Çalışıyor', 'Bitti', 'Hata', 'İptal'
+
+
+@dataclass
+class ScrapeJob:
+    category_path: List[str]
+    marketplace: str
+    browser: str
+    job_id: int = 0
+    status: str = QUEUED
+    products_done: int = 0
+    products_total: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    process: Optional[subprocess.Popen] = field(default=None, repr=False)
+
+    def command(self) -> List[str]:
+        return [sys.executable, '-u', 'data_scraper.py', self.category_path[0], self.marketplace.lower(),
+                self.browser.lower()] + self.category_path[1:]
+
+    def update_progress(self, line: str) -> None:
+        # Totals grow as listing pages are discovered, so done/total is "of what is known so far"
+        found = FOUND_PATTERN.match(line)
+        if found:
+            self.products_total += int(found.group(1))
+        elif PRODUCT_PATTERN.match(line):
+            self.products_done += 1
+
+    def products_per_minute(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return self.products_done * 60 / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{' > '.join(self.category_path)} ({self.marketplace})"
+
+
+class JobManager:
+    """Runs data_scraper.py jobs in background threads, ``max_concurrent`` at a time.
+
+    Worker threads never touch Tk: every output line and exit is posted to
+    ``events`` as (job_id, kind, payload) and the GUI drains it with
+    ``root.after``. stderr is merged into stdout so a full pipe cannot block
+    the child.
+    """
+
+    def __init__(self, max_concurrent: int = 2):
+        self.max_concurrent = max_concurrent
+        self.jobs: Dict[int, ScrapeJob] = {}
+        self.events: "queue.Queue[Tuple[int, str, object]]" = queue.Queue()
+        self._waiting: Deque[ScrapeJob] = deque()
+        self._running = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, job: ScrapeJob) -> ScrapeJob:
+        with self._lock:
+            job.job_id = next(self._ids)
+            self.jobs[job.job_id] = job
+            self._waiting.append(job)
+            self._start_waiting()
+        return job
+
+    def cancel(self, job_id: int) -> None:
+        with self._lock:
+            job = self.jobs[job_id]
+            if job.status == QUEUED:
+                self._waiting.remove(job)
+                job.status = CANCELLED
+                self.events.put((job_id, 'status', CANCELLED))
+            elif job.status == RUNNING:
+                job.status = CANCELLED
+                # An interrupt lets the scraper's finally block quit its browsers and
+                # flush its checkpoint; the worker thread sees the exit and frees the slot
+                if os.name == 'nt':
+                    job.process.terminate()
+                else:
+                    job.process.send_signal(signal.SIGINT)
+            elif job.status == CANCELLED and job.process is not None and job.process.poll() is None:
+                # Cancelling again kills a job that did not stop on the interrupt
+                job.process.kill()
+
+    def cancel_all(self) -> None:
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def _start_waiting(self) -> None:
+        while self._waiting and self._running < self.max_concurrent:
+            job = self._waiting.popleft()
+            job.status = RUNNING
+            job.started_at = time.monotonic()
+            try:
+                job.process = subprocess.Popen(job.command(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                               text=True, encoding='utf-8', errors='replace')
+            except OSError as e:
+                job.status = FAILED
+                self.events.put((job.job_id, 'output', f"Could not start data_scraper.py: {e}\n"))
+                self.events.put((job.job_id, 'status', FAILED))
+                continue
+            self._running += 1
+            self.events.put((job.job_id, 'status', RUNNING))
+            threading.Thread(target=self._watch, args=(job,), daemon=True).start()
+
+    def _watch(self, job: ScrapeJob) -> None:
+        for line in job.process.stdout:
+            self.events.put((job.job_id, 'output', line))
+        return_code = job.process.wait()
+        with self._lock:
+            job.finished_at = time.monotonic()
+            if job.status != CANCELLED:
+                job.status = DONE if return_code == 0 else FAILED
+            self._running -= 1
+            self.events.put((job.job_id, 'status', job.status))
+            self._start_waiting()
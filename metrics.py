@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# Latency buckets in seconds, from a selector lookup up to a slow page load
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def _prometheus_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (max for the +Inf bucket)."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 4),
+            'mean': round(self.sum / self.count, 4) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 4),
+            'p95': round(self.quantile(0.95), 4),
+            'max': round(self.max, 4),
+        }
+
+
+class Metrics:
+    """Counters and latency histograms for a scrape, tagged with labels such as market and category.
+
+    ``labels`` given to the constructor (the market) are added to every series.
+    Safe to share between the listing driver and the worker pool threads.
+    """
+
+    def __init__(self, prefix: str = 'scraper', **labels: object):
+        self.prefix = prefix
+        self.labels = labels
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: float = 1, **labels: object) -> None:
+        key = _label_key({**self.labels, **labels})
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: object) -> None:
+        key = _label_key({**self.labels, **labels})
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: object) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def to_dict(self) -> Dict[str, List[Dict[str, object]]]:
+        with self._lock:
+            return {
+                'counters': [{'name': name, 'labels': dict(key), 'value': value}
+                             for name, series in sorted(self.counters.items())
+                             for key, value in sorted(series.items())],
+                'histograms': [{'name': name, 'labels': dict(key), **histogram.to_dict()}
+                               for name, series in sorted(self.histograms.items())
+                               for key, histogram in sorted(series.items())],
+            }
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.extend(f"{metric}{_prometheus_labels(key)} {value:g}" for key, value in sorted(series.items()))
+            for name, series in sorted(self.histograms.items()):
+                metric = f"{self.prefix}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                        lines.append(f"{metric}_bucket{_prometheus_labels(key, (('le', le),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_prometheus_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{metric}_count{_prometheus_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the Prometheus text format atomically, as textfile collectors expect."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            file.write(self.to_prometheus())
+        os.replace(temporary_path, path)
+
+    def summary(self) -> str:
+        """Slowest series first, so the selector or page type holding a run back stands out."""
+        data = self.to_dict()
+        lines = ["Metrics:"]
+        for histogram in sorted(data['histograms'], key=lambda h: -h['sum']):
+            labels = ','.join(f"{name}={value}" for name, value in histogram['labels'].items())
+            lines.append(f"  {histogram['name']:<22} {labels:<50} n={histogram['count']:<6} "
+                         f"p50={histogram['p50']:.2f}s p95={histogram['p95']:.2f}s total={histogram['sum']:.1f}s")
+        for counter in data['counters']:
+            labels = ','.join(f"{name}={value}" for name, value in counter['labels'].items())
+            lines.append(f"  {counter['name']:<22} {labels:<50} {counter['value']:g}")
+        return "\n".join(lines)
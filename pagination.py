@@ -0,0 +1,65 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+
+def page_url(base_url: str, page: int, page_param: str = 'sayfa') -> str:
+    parsed_url = urlparse(base_url)
+    # Replace the page query parameter if it exists, keeping every other one
+    query_params = parse_qs(parsed_url.query)
+    query_params[page_param] = page
+    return urlunparse(parsed_url._replace(query=urlencode(query_params, doseq=True)))
+
+
+def parse_count(text: Optional[str]) -> Optional[int]:
+    """'1.234 ürün' -> 1234; None when there are no digits."""
+    if not text:
+        return None
+    digits = re.sub(r'\D', '', text)
+    return int(digits) if digits else None
+
+
+@dataclass
+class ListingPage:
+    page: int
+    url: str
+    hrefs: List[str] = field(default_factory=list)
+    card_prices: Dict[str, Optional[str]] = field(default_factory=dict)
+    # Content hash of each product's listing card, read when there is no card price selector
+    card_hashes: Dict[str, Optional[str]] = field(default_factory=dict)
+    # None when the market has no next_page selector and the answer is unknown
+    has_next: Optional[bool] = None
+    total_products: Optional[int] = None
+    total_pages: Optional[int] = None
+
+
+@dataclass
+class PaginationPlan:
+    """What the first listing page told us about the rest of the category."""
+
+    page_size: Optional[int] = None
+    total_products: Optional[int] = None
+    total_pages: Optional[int] = None
+
+    @classmethod
+    def from_first_page(cls, listing: ListingPage, page_size: Optional[int] = None) -> 'PaginationPlan':
+        # A first page that has a next page is a full page, so its card count is the page size
+        if page_size is None and listing.has_next and listing.hrefs:
+            page_size = len(listing.hrefs)
+        total_pages = listing.total_pages
+        if total_pages is None and listing.total_products is not None and page_size:
+            total_pages = max(1, math.ceil(listing.total_products / page_size))
+        return cls(page_size=page_size, total_products=listing.total_products, total_pages=total_pages)
+
+    def expected_cards(self, page: int) -> Optional[int]:
+        """How many product cards page ``page`` should show once fully scrolled, if known."""
+        if not self.page_size:
+            return None
+        if self.total_products is None:
+            return self.page_size
+        return max(0, min(self.page_size, self.total_products - (page - 1) * self.page_size))
+
+    def is_last(self, page: int) -> Optional[bool]:
+        return None if self.total_pages is None else page >= self.total_pages
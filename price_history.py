@@ -0,0 +1,269 @@
+import argparse
+import glob
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from prices import parse_price
+from product_index import canonical_url
+from result_sink import read_results
+
+DEFAULT_PATH = os.path.join("marketplace", "price_history.sqlite")
+DEFAULT_GLOB = os.path.join("marketplace", "*", "*.csv")
+TARIH_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Times are stored as seconds of Tarih's wall clock, the way the scraper writes it
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_cents(text: object) -> Optional[int]:
+    price = parse_price(text)
+    return int(price * 100) if price is not None else None
+
+
+def tarih_seconds(tarih: pd.Series) -> pd.Series:
+    """Seconds since 1970-01-01 of the wall-clock Tarih strings; unparseable values become NA."""
+    parsed = pd.to_datetime(tarih, format=TARIH_FORMAT, errors='coerce')
+    return ((parsed - EPOCH) // pd.Timedelta(seconds=1)).astype('Int64')
+
+
+def _cents_or_none(value: object) -> Optional[int]:
+    # Series.map turns None into NaN
+    return None if value is None or value != value else int(value)
+
+
+def start_of_day(day: Optional[str] = None) -> int:
+    """Wall-clock seconds of midnight of ``day`` (YYYY-MM-DD), today when omitted."""
+    date = datetime.strptime(day, '%Y-%m-%d') if day else datetime.now()
+    return int((date.replace(hour=0, minute=0, second=0, microsecond=0) - EPOCH).total_seconds())
+
+
+class PriceHistory:
+    """Price history of every product, stored as change points in SQLite.
+
+    A new row is only written when a product's price or discount differs from
+    its previous observation, so history grows with price moves rather than
+    with the number of runs. ``prices`` is clustered on (product, time), which
+    keeps a product's series a single range scan however long history gets.
+    Prices are integer kuruş; ``discount`` is NULL when there is no discount.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS products (
+                    product_id INTEGER PRIMARY KEY,
+                    market TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    name TEXT,
+                    last_seen INTEGER NOT NULL,
+                    price INTEGER,
+                    discount INTEGER,
+                    UNIQUE (market, url)
+                );
+                CREATE TABLE IF NOT EXISTS prices (
+                    product_id INTEGER NOT NULL,
+                    valid_from INTEGER NOT NULL,
+                    price INTEGER,
+                    discount INTEGER,
+                    discount_started INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (product_id, valid_from)
+                ) WITHOUT ROWID;
+                -- series() looks products up by URL alone when no market is given
+                CREATE INDEX IF NOT EXISTS products_url ON products (url);
+                CREATE INDEX IF NOT EXISTS prices_discount_started
+                    ON prices (valid_from) WHERE discount_started = 1;
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL
+                );""")
+        # (market, url) -> [product_id, last_seen, price, discount], loaded once for ingestion
+        self._products: Optional[Dict[Tuple[str, str], list]] = None
+        self.observations = 0
+        self.changes = 0
+        self.out_of_order = 0
+
+    def _load_products(self) -> Dict[Tuple[str, str], list]:
+        if self._products is None:
+            rows = self._connection.execute(
+                "SELECT market, url, product_id, last_seen, price, discount FROM products")
+            self._products = {(market, url): [product_id, last_seen, price, discount]
+                              for market, url, product_id, last_seen, price, discount in rows}
+        return self._products
+
+    def ingest(self, df: pd.DataFrame) -> int:
+        """Add the observations of one result file; returns the number of price changes written."""
+        products = self._load_products()
+        if df.empty or not {'Market', 'Kaynak', 'Tarih'} <= set(df.columns):
+            return 0
+        df = df.assign(observed_at=tarih_seconds(df['Tarih'])).dropna(subset=['observed_at', 'Market', 'Kaynak'])
+        df = df.sort_values('observed_at', kind='stable')
+        # Prices repeat a lot across rows, so each distinct string is parsed once
+        cents = {}
+        for column in ('Fiyat', 'İndirimli Fiyat'):
+            values = df[column] if column in df.columns else pd.Series(None, index=df.index, dtype=object)
+            cents[column] = values.map({value: to_cents(value) for value in values.unique()}).tolist()
+        names = df['Ürün Adı'].tolist() if 'Ürün Adı' in df.columns else [None] * len(df)
+        # Scraped rows carry '-' as İndirimli Fiyat and the shelf price as Fiyat when there is no discount
+        observations = zip(df['observed_at'].tolist(), df['Market'].tolist(), df['Kaynak'].map(canonical_url).tolist(),
+                           names, cents['Fiyat'], cents['İndirimli Fiyat'])
+
+        changes, touched = [], {}
+        for observed_at, market, url, name, price, discount in observations:
+            self.observations += 1
+            price, discount = _cents_or_none(price), _cents_or_none(discount)
+            state = products.get((market, url))
+            if state is None:
+                cursor = self._connection.execute(
+                    "INSERT INTO products (market, url, name, last_seen) VALUES (?, ?, ?, ?)",
+                    (market, url, name, observed_at))
+                state = products[(market, url)] = [cursor.lastrowid, None, None, None]
+            elif observed_at <= state[1]:
+                # Change points must be appended in time order; older files have to be ingested first
+                self.out_of_order += 1
+                continue
+            product_id, last_seen, last_price, last_discount = state
+            if last_seen is None or (price, discount) != (last_price, last_discount):
+                # A product first seen already discounted has no known start
+                started = discount is not None and last_seen is not None and last_discount is None
+                changes.append((product_id, observed_at, price, discount, int(started)))
+            state[1:] = [observed_at, price, discount]
+            touched[product_id] = (name, observed_at, price, discount, product_id)
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?)", changes)
+            self._connection.executemany(
+                "UPDATE products SET name = ?, last_seen = ?, price = ?, discount = ? WHERE product_id = ?",
+                touched.values())
+        self.changes += len(changes)
+        return len(changes)
+
+    def ingest_files(self, paths: Iterable[str]) -> None:
+        """Ingest result files oldest first, skipping files that were already ingested unchanged."""
+        for path in sorted(paths, key=os.path.getmtime):
+            stat = os.stat(path)
+            known = self._connection.execute(
+                "SELECT size, mtime FROM ingested_files WHERE path = ?", (path,)).fetchone()
+            if known == (stat.st_size, stat.st_mtime):
+                continue
+            started = time.perf_counter()
+            changes = self.ingest(read_results(path))
+            with self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?)",
+                                         (path, stat.st_size, stat.st_mtime))
+            print(f"Ingested {path}: {changes} price change(s) in {time.perf_counter() - started:.1f}s")
+
+    def series(self, url: str, market: Optional[str] = None, since: Optional[int] = None,
+               until: Optional[int] = None) -> pd.DataFrame:
+        """Price change points of one product; each price holds until the next row."""
+        query = """
+            SELECT p.market, p.name, datetime(h.valid_from, 'unixepoch') AS valid_from,
+                   h.price / 100.0 AS price, h.discount / 100.0 AS discount
+            FROM products p JOIN prices h ON h.product_id = p.product_id
+            WHERE p.url = ?"""
+        parameters: list = [canonical_url(url)]
+        if market:
+            query += " AND p.market = ?"
+            parameters.append(market)
+        if since is not None:
+            # The price in effect at ``since`` started at the last change before it
+            query += """ AND h.valid_from >= COALESCE((SELECT MAX(valid_from) FROM prices
+                         WHERE product_id = p.product_id AND valid_from <= ?), 0)"""
+            parameters.append(since)
+        if until is not None:
+            query += " AND h.valid_from < ?"
+            parameters.append(until)
+        return pd.read_sql_query(query + " ORDER BY p.market, h.valid_from", self._connection, params=parameters)
+
+    def latest(self, market: Optional[str] = None) -> pd.DataFrame:
+        """Latest known price of every product."""
+        query = """
+            SELECT market, name, url, datetime(last_seen, 'unixepoch') AS last_seen,
+                   price / 100.0 AS price, discount / 100.0 AS discount
+            FROM products"""
+        parameters = []
+        if market:
+            query += " WHERE market = ?"
+            parameters.append(market)
+        return pd.read_sql_query(query + " ORDER BY market, name", self._connection, params=parameters)
+
+    def discounts_started(self, day: Optional[str] = None, market: Optional[str] = None) -> pd.DataFrame:
+        """Products whose discount started on ``day`` (YYYY-MM-DD, default today)."""
+        start = start_of_day(day)
+        query = """
+            SELECT p.market, p.name, p.url, datetime(h.valid_from, 'unixepoch') AS started,
+                   h.price / 100.0 AS price, h.discount / 100.0 AS discount,
+                   ROUND(100.0 * (h.price - h.discount) / h.price, 1) AS percent_off
+            FROM prices h JOIN products p ON p.product_id = h.product_id
+            WHERE h.discount_started = 1 AND h.valid_from >= ? AND h.valid_from < ?"""
+        parameters: list = [start, start + 86400]
+        if market:
+            query += " AND p.market = ?"
+            parameters.append(market)
+        return pd.read_sql_query(query + " ORDER BY percent_off DESC", self._connection, params=parameters)
+
+    def summary(self) -> str:
+        return (f"Price history: {self.observations} observation(s), {self.changes} price change(s) stored, "
+                f"{self.out_of_order} out-of-order observation(s) skipped")
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def _print_or_save(df: pd.DataFrame, output: Optional[str]) -> None:
+    if output:
+        df.to_csv(output, index=False, encoding='utf-8-sig')
+        print(f"{len(df)} rows saved to {output}")
+    else:
+        print(df.to_string(index=False))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local price history of scraped products")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="SQLite file holding the history")
+    parser.add_argument('--output', default=None, help="Save query results to this CSV instead of printing")
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest_command = commands.add_parser('ingest', help="Add result files to the history")
+    ingest_command.add_argument('result_files', nargs='*',
+                                help=f"CSV or JSONL files; defaults to every {DEFAULT_GLOB}")
+    series_command = commands.add_parser('series', help="Price changes of one product")
+    series_command.add_argument('url')
+    series_command.add_argument('--market', default=None)
+    series_command.add_argument('--since', default=None, help="YYYY-MM-DD")
+    series_command.add_argument('--until', default=None, help="YYYY-MM-DD, exclusive")
+    latest_command = commands.add_parser('latest', help="Latest price of every product")
+    latest_command.add_argument('--market', default=None)
+    discounts_command = commands.add_parser('discounts', help="Discounts that started on a day")
+    discounts_command.add_argument('--date', default=None, help="YYYY-MM-DD, defaults to today")
+    discounts_command.add_argument('--market', default=None)
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(args.db) or '.', exist_ok=True)
+    history = PriceHistory(args.db)
+    try:
+        if args.command == 'ingest':
+            # Post-processed copies repeat the raw rows, so only raw results are globbed by default
+            paths = args.result_files or [path for path in glob.glob(DEFAULT_GLOB)
+                                          if not path.endswith('_updated.csv')]
+            history.ingest_files(paths)
+            print(history.summary())
+        elif args.command == 'series':
+            since = start_of_day(args.since) if args.since else None
+            until = start_of_day(args.until) if args.until else None
+            _print_or_save(history.series(args.url, args.market, since, until), args.output)
+        elif args.command == 'latest':
+            _print_or_save(history.latest(args.market), args.output)
+        elif args.command == 'discounts':
+            _print_or_save(history.discounts_started(args.date, args.market), args.output)
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+CENTS = Decimal('0.01')
+
+
+def parse_price(text: object) -> Optional[Decimal]:
+    """Parse Turkish-formatted prices such as '129,95 TL' or '1.299,95 ₺' into a Decimal.
+
+    Returns None for placeholders like '-', empty cells and anything unparseable.
+    """
+    if text is None or isinstance(text, float) and text != text:
+        return None
+    if isinstance(text, (int, float, Decimal)):
+        return Decimal(str(text)).quantize(CENTS)
+    cleaned = re.sub(r'[^\d.,]', '', str(text))
+    if not re.search(r'\d', cleaned):
+        return None
+    if ',' in cleaned:
+        # Comma is the decimal separator, dots group thousands
+        cleaned = cleaned.replace('.', '').replace(',', '.')
+    elif re.search(r'\.\d{3}$', cleaned):
+        # '1.299' is one thousand two hundred ninety-nine lira, not 1.3
+        cleaned = cleaned.replace('.', '')
+    try:
+        return Decimal(cleaned).quantize(CENTS)
+    except InvalidOperation:
+        return None
@@ -0,0 +1,140 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse, urlunparse
+
+def canonical_url(url: str) -> str:
+    """Drop query strings, fragments and trailing slashes so one product has one key."""
+    parsed = urlparse(url.strip())
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, '', '', ''))
+
+
+def price_digits(price: Optional[str]) -> Optional[str]:
+    """'1.299,95 TL' and '1299,95TL' both become '129995' so card and detail prices compare equal."""
+    if price is None:
+        return None
+    digits = re.sub(r'\D', '', price)
+    return digits or None
+
+
+def effective_price(product_info: Dict[str, str]) -> Optional[str]:
+    # The shelf price is the discounted one when there is a discount
+    discounted = product_info.get('İndirimli Fiyat')
+    if discounted and discounted != "-":
+        return discounted
+    return product_info.get('Fiyat')
+
+
+def content_hash(card_text: Optional[str]) -> Optional[str]:
+    """Hash of a listing card's visible text (name, prices, badges), whitespace-insensitive."""
+    if not card_text or not card_text.strip():
+        return None
+    return hashlib.sha1(" ".join(card_text.split()).encode('utf-8')).hexdigest()
+
+
+class ProductIndex:
+    """SQLite index of every product seen per market, used for delta scraping.
+
+    Listing pages ask ``needs_fetch`` for each product URL; only new products,
+    products whose card price moved and entries older than ``max_age_days`` get
+    a detail page visit. Everything else is just marked as seen. Markets without
+    a card price selector are compared by the content hash of the listing card
+    instead, which changes with any price shown on it; products with neither
+    are always fetched.
+    """
+
+    def __init__(self, path: str, max_age_days: Optional[float] = 7):
+        self.path = path
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    market TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    current_price TEXT,
+                    old_price TEXT,
+                    price_digits TEXT,
+                    content_hash TEXT,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    last_fetched REAL NOT NULL,
+                    PRIMARY KEY (market, url)
+                )""")
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(products)")}
+            if 'content_hash' not in columns:
+                # Indexes written while the column was briefly dropped
+                self._connection.execute("ALTER TABLE products ADD COLUMN content_hash TEXT")
+        self.fetched = 0
+        self.skipped = 0
+
+    def needs_fetch(self, market: str, url: str, card_price: Optional[str] = None,
+                    card_hash: Optional[str] = None) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT price_digits, content_hash, last_fetched FROM products WHERE market = ? AND url = ?",
+                (market, canonical_url(url))).fetchone()
+        if row is None:
+            return True
+        stored_digits, stored_hash, last_fetched = row
+        card_digits = price_digits(card_price)
+        # Skipping is only safe when the listing shows the same price or card as the last visit
+        if card_digits is not None:
+            if card_digits != stored_digits:
+                return True
+        elif card_hash is None or card_hash != stored_hash:
+            return True
+        return self.max_age_seconds is not None and time.time() - last_fetched > self.max_age_seconds
+
+    def select(self, market: str, urls: Iterable[str], card_prices: Dict[str, Optional[str]],
+               card_hashes: Optional[Dict[str, Optional[str]]] = None) -> list:
+        """Split listing URLs into the ones to fetch, touching the rest as seen."""
+        card_hashes = card_hashes or {}
+        to_fetch, unchanged = [], []
+        for url in urls:
+            fetch = self.needs_fetch(market, url, card_prices.get(url), card_hashes.get(url))
+            (to_fetch if fetch else unchanged).append(url)
+        self.touch(market, unchanged)
+        self.fetched += len(to_fetch)
+        self.skipped += len(unchanged)
+        return to_fetch
+
+    def touch(self, market: str, urls: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE products SET last_seen = ? WHERE market = ? AND url = ?",
+                [(now, market, canonical_url(url)) for url in urls])
+
+    def record(self, product_info: Dict[str, str], card_hash: Optional[str] = None) -> None:
+        """Store a fetched product along with the content hash of the listing card it was queued from."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute("""
+                INSERT INTO products (market, url, current_price, old_price, price_digits, content_hash,
+                                      first_seen, last_seen, last_fetched)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (market, url) DO UPDATE SET
+                    current_price = excluded.current_price,
+                    old_price = excluded.old_price,
+                    price_digits = excluded.price_digits,
+                    content_hash = excluded.content_hash,
+                    last_seen = excluded.last_seen,
+                    last_fetched = excluded.last_fetched""",
+                (product_info['Market'], canonical_url(product_info['Kaynak']),
+                 product_info.get('İndirimli Fiyat'), product_info.get('Fiyat'),
+                 price_digits(effective_price(product_info)), card_hash, now, now, now))
+
+    def summary(self) -> str:
+        total = self.fetched + self.skipped
+        return f"Product index: {self.fetched}/{total} product pages fetched, {self.skipped} unchanged"
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
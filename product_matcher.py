@@ -0,0 +1,261 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import pandas as pd
+from data_scraper import normalize_string
+from prices import parse_price
+from product_index import canonical_url, effective_price
+from result_sink import read_results
+from text_splitter import ADET_PATTERN, BIRIM_MIKTAR_PATTERN
+
+DEFAULT_PATH = os.path.join("marketplace", "product_matches.sqlite")
+# Minimum similarity for two products from different markets to be treated as the same
+MATCH_THRESHOLD = 0.55
+# Only this many of a name's rarest tokens are used to look up candidates
+CANDIDATE_TOKENS = 3
+# Units folded to a base unit so "1 L" and "1000 ml" land in the same block
+UNIT_FACTORS = {
+    'g': ('g', 1), 'gr': ('g', 1), 'gram': ('g', 1), 'kg': ('g', 1000),
+    'ml': ('ml', 1), 'cl': ('ml', 10), 'l': ('ml', 1000), 'lt': ('ml', 1000), 'litre': ('ml', 1000),
+}
+UNIT_WORDS = set(UNIT_FACTORS) | {'adet', 'li', 'lu', 'x'}
+_UNITS = '|'.join(sorted(UNIT_FACTORS, key=len, reverse=True))
+# "6 x 1,5 L": the count comes before the size it multiplies
+PACK_COUNT_PATTERN = re.compile(rf'(\d+)\s*[x×]\s*[\d.,]+\s*(?:{_UNITS})(?![a-zA-Z])', re.IGNORECASE)
+# "1,5 L x 6" or "x 6 adet"; an x followed by a size, as in "6 x 1,5 L", is not a count
+TRAILING_COUNT_PATTERN = re.compile(rf'[x×]\s*(\d+)(?![\d.,]*\s*(?:{_UNITS})(?![a-zA-Z]))', re.IGNORECASE)
+
+
+def normalize_name(text: object) -> str:
+    if not isinstance(text, str):
+        return ''
+    return re.sub(r'[^a-z0-9]+', ' ', normalize_string(text)).strip()
+
+
+def size_key(product_name: object) -> Optional[str]:
+    """Pack size as a blocking key, e.g. '6x1000ml' for "Su 6'lı 1 L"; None when the name has no unit."""
+    if not isinstance(product_name, str):
+        return None
+    match = BIRIM_MIKTAR_PATTERN.search(product_name)
+    if not match or match.group(2).lower() not in UNIT_FACTORS:
+        return None
+    try:
+        amount = float(match.group(1).replace(',', '.'))
+    except ValueError:
+        return None
+    unit, factor = UNIT_FACTORS[match.group(2).lower()]
+    pack = (ADET_PATTERN.search(product_name) or PACK_COUNT_PATTERN.search(product_name)
+            or TRAILING_COUNT_PATTERN.search(product_name))
+    count = int(pack.group(1)) if pack else 1
+    return f"{count}x{amount * factor:g}{unit}"
+
+
+def name_tokens(product_name: object, brand: str = '') -> List[str]:
+    """Name tokens without size words, which live in the block key, or the normalized ``brand``."""
+    brand_tokens = set(brand.split())
+    return [token for token in normalize_name(product_name).split()
+            if not token.isdigit() and token not in UNIT_WORDS and token not in brand_tokens]
+
+
+def trigrams(tokens: Iterable[str]) -> FrozenSet[str]:
+    text = f" {' '.join(tokens)} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+@dataclass
+class Entry:
+    market: str
+    url: str
+    brand: str
+    size: Optional[str]
+    tokens: Tuple[str, ...]
+    grams: FrozenSet[str]
+    group_id: int
+
+
+def similarity(left: Entry, right: Entry) -> float:
+    """Trigram Jaccard of the names, nudged by whether the brands agree."""
+    union = len(left.grams | right.grams)
+    score = len(left.grams & right.grams) / union if union else 0.0
+    if left.brand and right.brand:
+        score += 0.15 if left.brand == right.brand else -0.25
+    return max(0.0, min(1.0, score))
+
+
+class ProductMatcher:
+    """Groups the same product across markets for price comparison.
+
+    Products are blocked on pack size and looked up through an inverted index
+    of their rarest name tokens, so each new product is only scored against a
+    handful of candidates instead of the whole catalog. Groups, confidences
+    and latest prices live in SQLite, so new CSVs are matched incrementally.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, threshold: float = MATCH_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    market TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    name TEXT,
+                    brand TEXT,
+                    size TEXT,
+                    group_id INTEGER NOT NULL,
+                    confidence REAL NOT NULL,
+                    price TEXT,
+                    scraped_at TEXT,
+                    PRIMARY KEY (market, url)
+                )""")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS products_group ON products (group_id)")
+        self._entries: Dict[Tuple[str, str], Entry] = {}
+        # size -> token -> entries; the inverted index is per block
+        self._blocks: Dict[Optional[str], Dict[str, List[Entry]]] = defaultdict(lambda: defaultdict(list))
+        self._group_markets: Dict[int, set] = defaultdict(set)
+        self._next_group = 1
+        self.matched = 0
+        self.created = 0
+        self.updated = 0
+        self._load()
+
+    def _load(self) -> None:
+        rows = self._connection.execute("SELECT market, url, name, brand, size, group_id FROM products")
+        for market, url, name, brand, size, group_id in rows:
+            self._add_entry(self._entry(market, url, name, brand, size, group_id))
+            self._next_group = max(self._next_group, group_id + 1)
+
+    @staticmethod
+    def _entry(market: str, url: str, name: object, brand: object, size: Optional[str], group_id: int) -> Entry:
+        brand = normalize_name(brand)
+        tokens = tuple(name_tokens(name, brand))
+        return Entry(market, url, brand, size, tokens, trigrams(tokens), group_id)
+
+    def _add_entry(self, entry: Entry) -> None:
+        self._entries[(entry.market, entry.url)] = entry
+        postings = self._blocks[entry.size]
+        for token in set(entry.tokens):
+            postings[token].append(entry)
+        self._group_markets[entry.group_id].add(entry.market)
+
+    def _candidates(self, entry: Entry) -> Iterable[Entry]:
+        postings = self._blocks.get(entry.size)
+        if not postings:
+            return []
+        known = [token for token in set(entry.tokens) if token in postings]
+        rarest = sorted(known, key=lambda token: len(postings[token]))[:CANDIDATE_TOKENS]
+        seen = {}
+        for token in rarest:
+            for candidate in postings[token]:
+                seen[id(candidate)] = candidate
+        return seen.values()
+
+    def best_match(self, entry: Entry) -> Tuple[Optional[Entry], float]:
+        best, best_score = None, 0.0
+        for candidate in self._candidates(entry):
+            # A group holds at most one product per market
+            if entry.market in self._group_markets[candidate.group_id]:
+                continue
+            score = similarity(entry, candidate)
+            if score > best_score:
+                best, best_score = candidate, score
+        return (best, best_score) if best_score >= self.threshold else (None, 0.0)
+
+    def ingest(self, df: pd.DataFrame) -> int:
+        """Match every row of a scraper result file; known products only get their price refreshed."""
+        inserts, updates = [], []
+        for row in df.to_dict('records'):
+            url, market = row.get('Kaynak'), row.get('Market')
+            if not isinstance(url, str) or not isinstance(market, str):
+                continue
+            url = canonical_url(url)
+            price = parse_price(effective_price({key: value for key, value in row.items() if isinstance(value, str)}))
+            price = str(price) if price is not None else None
+            name, brand, scraped_at = row.get('Ürün Adı'), row.get('Marka'), row.get('Tarih')
+            if (market, url) in self._entries:
+                updates.append((price, scraped_at, name, market, url))
+                continue
+            entry = self._entry(market, url, name, brand, size_key(name), 0)
+            match, confidence = self.best_match(entry)
+            if match:
+                entry.group_id = match.group_id
+                self.matched += 1
+            else:
+                entry.group_id, confidence = self._next_group, 1.0
+                self._next_group += 1
+                self.created += 1
+            self._add_entry(entry)
+            inserts.append((market, url, name, brand, entry.size, entry.group_id, confidence, price, scraped_at))
+        self.updated += len(updates)
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", inserts)
+            self._connection.executemany(
+                "UPDATE products SET price = ?, scraped_at = ?, name = ? WHERE market = ? AND url = ?", updates)
+        return len(inserts) + len(updates)
+
+    def comparison(self, min_markets: int = 2) -> pd.DataFrame:
+        """Price-comparison table: one row per product group, a name and price column per market."""
+        df = pd.read_sql_query(
+            "SELECT group_id, market, name, price, confidence FROM products", self._connection)
+        if df.empty:
+            return df
+        groups = df.groupby('group_id')
+        df = df[groups['market'].transform('nunique') >= min_markets]
+        if df.empty:
+            return pd.DataFrame()
+        table = df.pivot(index='group_id', columns='market', values=['name', 'price'])
+        table.columns = [f"{market} {'Ürün Adı' if field == 'name' else 'Fiyat'}" for field, market in table.columns]
+        # Founding products have confidence 1.0, so the minimum is the weakest link in the group
+        table['Eşleşme Güveni'] = df.groupby('group_id')['confidence'].min().round(3)
+        return table.reset_index().rename(columns={'group_id': 'Grup'})
+
+    def summary(self) -> str:
+        return (f"Product matcher: {len(self._entries)} products, {self.matched} matched, "
+                f"{self.created} new group(s), {self.updated} price update(s)")
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Match products across markets and compare their prices")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="SQLite file holding the matched catalog")
+    parser.add_argument('--threshold', type=float, default=MATCH_THRESHOLD, help="Minimum match similarity")
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest_command = commands.add_parser('ingest', help="Match new CSV or JSONL result files into the catalog")
+    ingest_command.add_argument('result_files', nargs='+')
+    compare_command = commands.add_parser('compare', help="Write the price-comparison table")
+    compare_command.add_argument('--output', default=None, help="CSV path, printed to stdout when omitted")
+    compare_command.add_argument('--min-markets', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(args.db) or '.', exist_ok=True)
+    matcher = ProductMatcher(args.db, threshold=args.threshold)
+    try:
+        if args.command == 'ingest':
+            for result_file in args.result_files:
+                started = time.perf_counter()
+                rows = matcher.ingest(read_results(result_file))
+                print(f"Matched {rows} rows from {result_file} in {time.perf_counter() - started:.1f}s")
+            print(matcher.summary())
+        elif args.command == 'compare':
+            table = matcher.comparison(args.min_markets)
+            if args.output:
+                table.to_csv(args.output, index=False, encoding='utf-8-sig')
+                print(f"Comparison of {len(table)} products saved to {args.output}")
+            else:
+                print(table.to_string(index=False))
+    finally:
+        matcher.close()
+
+
+if __name__ == "__main__":
+    main()
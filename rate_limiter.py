@@ -0,0 +1,135 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class CircuitOpenError(Exception):
+    """A host kept failing after repeated cool-downs; requests to it fail fast."""
+
+
+@dataclass
+class RetryPolicy:
+    """How often a transient failure is retried, with full-jitter exponential backoff."""
+
+    attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        # Full jitter keeps workers that failed together from retrying together
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+@dataclass
+class _HostState:
+    rate: float
+    tokens: float
+    updated: float
+    latency: Optional[float] = None  # moving average of successful loads
+    baseline: Optional[float] = None  # fastest moving average seen, the unloaded latency
+    failures: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket whose rate follows the host's health.
+
+    Every fast success adds ``increase`` requests per second up to
+    ``max_rate``; an error halves the rate and a load much slower than the
+    host's baseline latency cuts it by a third (AIMD), so the scraper settles
+    just below the rate the site tolerates. ``failure_threshold`` consecutive
+    errors open the host's circuit: requests wait out a cool-down that doubles
+    with every trip and then resume at ``min_rate``. After ``max_trips`` trips
+    in a row ``wait`` raises CircuitOpenError instead of waiting again.
+    ``max_rate=None`` caps the rate at 10 per second; ``max_rate=0`` turns
+    limiting off, for local replays.
+    """
+
+    SLOW_FACTOR = 3.0
+    SLOW_SECONDS = 2.0
+
+    def __init__(self, max_rate: Optional[float] = None, initial_rate: float = 2.0, min_rate: float = 0.2,
+                 increase: float = 0.25, burst: float = 2.0, failure_threshold: int = 5,
+                 cooldown: float = 30.0, max_trips: int = 3):
+        self.enabled = max_rate != 0
+        self.max_rate = max_rate or 10.0
+        self.initial_rate = min(initial_rate, self.max_rate)
+        self.min_rate = min(min_rate, self.initial_rate)
+        self.increase = increase
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(rate=self.initial_rate, tokens=self.burst,
+                                                    updated=time.monotonic())
+        return state
+
+    def wait(self, url: str) -> None:
+        if not self.enabled:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            if state.open_until > now and state.trips > self.max_trips:
+                raise CircuitOpenError(f"{host} failed {state.trips} cool-downs in a row")
+            start = max(now, state.open_until)
+            state.tokens = min(self.burst, state.tokens + max(0.0, start - state.updated) * state.rate)
+            state.updated = start
+            # Take the token now, going into debt if needed, so other threads queue up behind it
+            state.tokens -= 1
+            delay = start - now + max(0.0, -state.tokens / state.rate)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, url: str, seconds: float, ok: bool) -> None:
+        if not self.enabled:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._state(host)
+            if not ok:
+                state.failures += 1
+                state.rate = max(self.min_rate, state.rate / 2)
+                if state.failures >= self.failure_threshold:
+                    self._trip(host, state)
+                return
+            state.failures = 0
+            state.trips = 0
+            state.latency = seconds if state.latency is None else 0.8 * state.latency + 0.2 * seconds
+            state.baseline = state.latency if state.baseline is None else min(state.baseline, state.latency)
+            if seconds > max(self.SLOW_SECONDS, state.baseline * self.SLOW_FACTOR):
+                state.rate = max(self.min_rate, state.rate * 2 / 3)
+            else:
+                state.rate = min(self.max_rate, state.rate + self.increase)
+
+    def _trip(self, host: str, state: _HostState) -> None:
+        state.trips += 1
+        state.failures = 0
+        cooldown = self.cooldown * 2 ** (state.trips - 1)
+        state.open_until = time.monotonic() + cooldown
+        state.rate = self.min_rate
+        # One request probes the host as soon as the cool-down ends
+        state.tokens = 1.0
+        print(f"{host} failed {self.failure_threshold} times in a row, pausing it for {cooldown:.0f}s")
+
+    def rate(self, url: str) -> float:
+        with self._lock:
+            return self._state(urlparse(url).netloc).rate
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Rate limiter: disabled"
+        with self._lock:
+            hosts = ", ".join(f"{host} {state.rate:.2f}/s" for host, state in sorted(self._hosts.items()))
+        return f"Rate limiter: {hosts or 'no requests'}"
@@ -0,0 +1,244 @@
+import csv
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+# Columns that do not identify a row: the same product scraped twice only differs in time
+VOLATILE_COLUMNS = {'Tarih'}
+
+
+def row_hash(row: Dict[str, object]) -> int:
+    content = json.dumps([(key, row[key]) for key in sorted(row) if key not in VOLATILE_COLUMNS],
+                         ensure_ascii=False, default=str)
+    return int.from_bytes(hashlib.blake2b(content.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class ResultSink(ABC):
+    """Appends result rows to disk as soon as they are extracted.
+
+    Duplicates are dropped with a set of 64-bit row hashes instead of a
+    full-frame ``drop_duplicates``, and the file is fsync'ed every
+    ``fsync_every`` rows so a crash loses at most that many products.
+    """
+
+    def __init__(self, path: Optional[str], fsync_every: int = 20, resume: bool = False):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.rows_written = 0
+        self.duplicates = 0
+        self._seen = set()
+        self._unsynced = 0
+        self._lock = threading.Lock()
+        if resume and path and os.path.exists(path):
+            for row in self._read_existing():
+                self._seen.add(row_hash(row))
+            self.rows_written = len(self._seen)
+        self._file = self._open(resume)
+
+    @abstractmethod
+    def _open(self, resume: bool):
+        ...
+
+    @abstractmethod
+    def _read_existing(self) -> Iterable[Dict[str, object]]:
+        ...
+
+    @abstractmethod
+    def _write_row(self, row: Dict[str, object]) -> None:
+        ...
+
+    def write(self, row: Dict[str, object]) -> bool:
+        """Append ``row`` unless it was already written; returns whether it was new."""
+        key = row_hash(row)
+        with self._lock:
+            if key in self._seen:
+                self.duplicates += 1
+                return False
+            self._seen.add(key)
+            self._write_row(row)
+            self.rows_written += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync()
+        return True
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+
+
+class CsvSink(ResultSink):
+    """UTF-8-BOM CSV, same layout the end-of-run DataFrame export used to produce."""
+
+    def _open(self, resume: bool):
+        self._fieldnames: Optional[List[str]] = None
+        self._writer = None
+        if resume and os.path.exists(self.path) and os.path.getsize(self.path):
+            with open(self.path, newline='', encoding='utf-8-sig') as existing:
+                self._fieldnames = next(csv.reader(existing), None)
+        # Appending to a non-empty file does not repeat the BOM
+        return open(self.path, 'a' if resume else 'w', newline='', encoding='utf-8-sig')
+
+    def _read_existing(self) -> Iterable[Dict[str, object]]:
+        with open(self.path, newline='', encoding='utf-8-sig') as existing:
+            yield from csv.DictReader(existing)
+
+    def _write_row(self, row: Dict[str, object]) -> None:
+        if self._writer is None:
+            write_header = self._fieldnames is None
+            self._fieldnames = self._fieldnames or list(row)
+            self._writer = csv.DictWriter(self._file, fieldnames=self._fieldnames, restval='',
+                                          extrasaction='ignore')
+            if write_header:
+                self._writer.writeheader()
+        self._writer.writerow(row)
+
+
+class JsonlSink(ResultSink):
+    """One JSON object per line; tolerant of rows with differing keys."""
+
+    def _open(self, resume: bool):
+        return open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _read_existing(self) -> Iterable[Dict[str, object]]:
+        with open(self.path, encoding='utf-8') as existing:
+            for line in existing:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from a crash
+
+    def _write_row(self, row: Dict[str, object]) -> None:
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class MemorySink(ResultSink):
+    """Keeps rows in a list; for benchmarks and one-off runs that never touch disk."""
+
+    def __init__(self):
+        self.rows: List[Dict[str, object]] = []
+        super().__init__(path=None)
+
+    def _open(self, resume: bool):
+        return None
+
+    def _read_existing(self) -> Iterable[Dict[str, object]]:
+        return []
+
+    def _write_row(self, row: Dict[str, object]) -> None:
+        self.rows.append(row)
+
+    def _sync(self) -> None:
+        self._unsynced = 0
+
+    def close(self) -> None:
+        pass
+
+
+SINKS = {'csv': CsvSink, 'jsonl': JsonlSink}
+
+
+def read_results(path: str):
+    """Read a CSV or JSONL result file into a DataFrame with every CSV cell kept as text.
+
+    Only empty cells become NaN, so prices such as "-" and names such as "NA" survive.
+    """
+    # Imported lazily; writing results does not need pandas
+    import pandas as pd
+    if path.endswith('.jsonl'):
+        return pd.read_json(path, lines=True, dtype=False)
+    # Scraper and text_splitter output is UTF-8 with a BOM
+    return pd.read_csv(path, encoding='utf-8-sig', dtype=str, keep_default_na=False, na_values=[''])
+
+
+def open_sink(path: str, output_format: str, fsync_every: int = 20, resume: bool = False) -> ResultSink:
+    if output_format not in SINKS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    return SINKS[output_format](path, fsync_every=fsync_every, resume=resume)
+
+
+class RunCheckpoint:
+    """Per-category progress of a tree walk, persisted after every synced batch.
+
+    Keyed by the category's full path ("icecek/cay"), because the same name can
+    appear under several branches. Stores the output file, the listing page and
+    the first product index on that page that is not known to be written, so
+    ``--resume`` can pick up where a crashed run stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state = {'categories': {}}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                self.state = json.load(file)
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        return self.state['categories'].get(key)
+
+    def update(self, key: str, **fields) -> None:
+        self.state['categories'].setdefault(key, {}).update(fields)
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(self.state, file, ensure_ascii=False, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        # Atomic on POSIX and Windows, so a crash never leaves a half-written checkpoint
+        os.replace(temporary_path, self.path)
+
+    def clear(self) -> None:
+        self.state = {'categories': {}}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class DeadLetterLog:
+    """JSON lines of product URLs that still failed after every retry.
+
+    ``data_scraper.py --retry-dead-letters`` re-runs just these URLs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def add(self, url: str, category_name: str, error: str, attempts: int) -> None:
+        entry = {'url': url, 'category': category_name, 'error': error, 'attempts': attempts,
+                 'failed_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def entries(self) -> List[Dict[str, object]]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def replace_with(self, other: 'DeadLetterLog') -> None:
+        """Atomically make this log hold exactly ``other``'s entries, consuming ``other``."""
+        if os.path.exists(other.path):
+            os.replace(other.path, self.path)
+        else:
+            self.clear()
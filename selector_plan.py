@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from selenium.webdriver.common.by import By
+
+# Fields every market must configure; the rest are optional
+REQUIRED_FIELDS = ('image', 'product_name', 'current_price')
+# Listing-page selectors and selectors that are not product fields
+STRUCTURAL_KEYS = {'grid', 'product_link', 'next_page', 'card_price', 'description_tabs', 'description'}
+# XPaths in the "pagination" block; its other keys are plain values
+PAGINATION_LOCATORS = ('total_count', 'total_pages')
+FALLBACK_SUFFIX = '_fallback'
+DEFAULT_PRODUCT_LINK = ".//a[@href]"
+
+
+class SelectorPlanError(ValueError):
+    """A market config cannot be compiled into a selector plan."""
+
+
+@dataclass(frozen=True)
+class SelectorPlan:
+    """Everything the scraper looks up on a market's pages, resolved once per run.
+
+    ``fields`` maps each product field to its (selector key, XPath) candidates
+    in the order they are tried, so fallbacks need no special casing. Every
+    extraction backend reads the same plan. Listing-page locators the market
+    does not configure are None.
+    """
+
+    market: str
+    grid: Tuple[str, str]
+    product_link: str
+    fields: Dict[str, Tuple[Tuple[str, str], ...]]
+    # Tabbed product descriptions; both are set or neither
+    description_tabs: Optional[str] = None
+    description: Optional[str] = None
+    next_page: Optional[str] = None
+    # Relative to a product link on the listing card
+    card_price: Optional[str] = None
+    total_count: Optional[str] = None
+    total_pages: Optional[str] = None
+
+    def has(self, field: str) -> bool:
+        return field in self.fields
+
+    def xpaths(self, field: str) -> List[str]:
+        return [xpath for _, xpath in self.fields.get(field, ())]
+
+    def field_xpaths(self) -> Dict[str, List[str]]:
+        """Candidate XPaths of every field, in the JSON-friendly form the batch script takes."""
+        return {field: self.xpaths(field) for field in self.fields}
+
+
+def _xpath_errors(selectors: Dict[str, str]) -> List[str]:
+    try:
+        # lxml is only needed for the syntax check; without it plans are still compiled
+        from lxml import etree
+    except ImportError:
+        return []
+    errors = []
+    for key, xpath in selectors.items():
+        if not isinstance(xpath, str) or not xpath.strip():
+            continue  # reported as empty
+        try:
+            etree.XPath(xpath)
+        except etree.XPathSyntaxError as e:
+            errors.append(f"selector '{key}' is not a valid XPath ({e}): {xpath}")
+    return errors
+
+
+def compile_plan(config) -> SelectorPlan:
+    """Validate ``config.selectors`` and turn them into a SelectorPlan.
+
+    Listing grids come from the "grid" XPath selector when present, otherwise
+    from ``grid_class``; product links from "product_link" (default: any link
+    inside the grid). Raises SelectorPlanError listing every problem at once.
+    """
+    selectors = dict(config.selectors)
+    pagination = {key: config.pagination[key] for key in PAGINATION_LOCATORS if key in config.pagination}
+    # Pagination XPaths are checked alongside the selectors, named by where they live in the config
+    locators = {**selectors, **{f"pagination.{key}": xpath for key, xpath in pagination.items()}}
+    errors = [f"selector '{key}' is empty" for key, xpath in locators.items()
+              if not isinstance(xpath, str) or not xpath.strip()]
+    errors += [f"missing required selector '{field}'" for field in REQUIRED_FIELDS if field not in selectors]
+    if 'grid' not in selectors and not config.grid_class:
+        errors.append("neither a 'grid' selector nor grid_class is configured")
+    errors += [f"selector '{key}' has no '{key[:-len(FALLBACK_SUFFIX)]}' to fall back from"
+               for key in selectors
+               if key.endswith(FALLBACK_SUFFIX) and key[:-len(FALLBACK_SUFFIX)] not in selectors]
+    if 'description_tabs' in selectors and 'description' not in selectors:
+        errors.append("'description_tabs' needs a 'description' selector")
+    errors += _xpath_errors(locators)
+    if errors:
+        raise SelectorPlanError(f"Invalid selectors for market '{config.name}':\n  " + "\n  ".join(errors))
+
+    fields = {}
+    for key, xpath in selectors.items():
+        if key in STRUCTURAL_KEYS or key.endswith(FALLBACK_SUFFIX):
+            continue
+        candidates = [(key, xpath)]
+        fallback_key = key + FALLBACK_SUFFIX
+        if fallback_key in selectors:
+            candidates.append((fallback_key, selectors[fallback_key]))
+        fields[key] = tuple(candidates)
+    grid = (By.XPATH, selectors['grid']) if 'grid' in selectors else (By.CLASS_NAME, config.grid_class)
+    has_tabs = 'description_tabs' in selectors
+    return SelectorPlan(market=config.name, grid=grid,
+                        product_link=selectors.get('product_link', DEFAULT_PRODUCT_LINK), fields=fields,
+                        description_tabs=selectors['description_tabs'] if has_tabs else None,
+                        description=selectors['description'] if has_tabs else None,
+                        next_page=selectors.get('next_page'), card_price=selectors.get('card_price'),
+                        total_count=pagination.get('total_count'), total_pages=pagination.get('total_pages'))
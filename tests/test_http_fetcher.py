@@ -0,0 +1,56 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_fetcher import HttpFetcher  # noqa: E402
+from selector_plan import SelectorPlan  # noqa: E402
+
+PAGE = "<html><body><h1>Pınar Süt 1 L</h1></body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Path -> (Content-Type, encoding of the body)
+    responses = {
+        '/no-charset': ('text/html', 'utf-8'),
+        '/header-charset': ('text/html; charset=windows-1254', 'windows-1254'),
+    }
+
+    def do_GET(self):
+        content_type, encoding = self.responses[self.path]
+        body = PAGE.encode(encoding)
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def product_name(path):
+    server = serve()
+    fetcher = HttpFetcher(SelectorPlan(market='test', grid=('xpath', '//div'), product_link='.//a', fields={}))
+    try:
+        document = fetcher.fetch(f"http://127.0.0.1:{server.server_address[1]}{path}")
+        return document.xpath('//h1')[0].text_content()
+    finally:
+        fetcher.close()
+        server.shutdown()
+
+
+def test_response_without_charset_is_read_as_utf8():
+    assert product_name('/no-charset') == "Pınar Süt 1 L"
+
+
+def test_charset_from_content_type_is_used():
+    assert product_name('/header-charset') == "Pınar Süt 1 L"
@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from product_matcher import size_key  # noqa: E402
+
+
+def test_multipack_and_single_unit_get_different_keys():
+    assert size_key("Su 6 x 1,5 L") == "6x1500ml"
+    assert size_key("Su 1,5 L") == "1x1500ml"
+
+
+def test_pack_count_spellings_agree():
+    assert size_key("Su 1,5 L x 6") == "6x1500ml"
+    assert size_key("Su 6'lı 1,5 L") == "6x1500ml"
+    assert size_key("Su 6×1.5 lt") == "6x1500ml"
+
+
+def test_size_after_x_is_not_a_count():
+    assert size_key("Islak Mendil 90 g x 3") == "3x90g"
+    assert size_key("Islak Mendil x 90 g") == "1x90g"
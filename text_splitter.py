@@ -1,112 +1,167 @@
 import pandas as pd
 import sys
-import os
 import json
 import re
 
-# Get the file name from the command-line arguments
-if len(sys.argv) < 2:
-    print("Usage: python text_splitter.py <input_file>")
-    sys.exit(1)
+# Description tabs that become their own columns
+SECTION_NAMES = ["Saklama Koşulları", "İçindekiler", "Besin Değerleri", "Alerjen Uyarısı", "Kullanım Önerisi", "Ürün Bilgileri", "İade Koşulları"]
 
-input_file = sys.argv[1]
+# Quantity (Adet) such as "6'lı" or "12 li", otherwise a multiplier such as "x 4"
+ADET_PATTERN = re.compile(r'(\d+)\s*[\'\']?[lL][iİıIuUüÜ]', re.IGNORECASE)
+ADET_MULTIPLIER_PATTERN = re.compile(r'x\s*(\d+)', re.IGNORECASE)
 
-# Load the data from the CSV file
-df = pd.read_csv(input_file)
-
-# Ensure 'Açıklama' column exists
-if 'Açıklama' not in df.columns:
-    df['Açıklama'] = ""
-
-# Fill NaN values with empty strings in the 'Açıklama' column
-df['Açıklama'] = df['Açıklama'].fillna('')
+# Last "<amount> <unit>" pair in the name, e.g. "1,5 L" or "500gr". The greedy prefix and the
+# boundaries make this match exactly what searching the reversed name used to find.
+BIRIM_MIKTAR_PATTERN = re.compile(r'^.*(?<![\d,.])([\d,.]+)\s*([a-zA-Z]+)(?![a-zA-Z])', re.DOTALL)
 
 # Function to extract quantity (Adet) from 'Ürün Adı'
-def extract_adet(product_name):
-    if pd.isna(product_name):
-        return None
-    match = re.search(r'(\d+)\s*[\'\']?[lL][iİıIuUüÜ]', product_name, re.IGNORECASE)
-    if match:
-        return match.group(1)[::-1]
-    match = re.search(r'x\s*(\d+)', product_name, re.IGNORECASE)
-    if match:
-        return match.group(1)[::-1]
-    return None
+def extract_adet(names: pd.Series) -> pd.Series:
+    adet = names.str.extract(ADET_PATTERN, expand=False)
+    # The multiplier form is only tried where the "'li" form did not match
+    missing = adet.isna() & names.notna()
+    adet[missing] = names[missing].str.extract(ADET_MULTIPLIER_PATTERN, expand=False)
+    return adet.str[::-1].fillna('1')
 
 # Function to extract unit and amount (Birim and Miktar) from 'Ürün Adı'
-def extract_birim_miktar(product_name):
-    if pd.isna(product_name):
-        return None, None
-    reversed_name = product_name[::-1]
-    match = re.search(r'([a-zA-Z]+)\s*([\d,\.]+)', reversed_name)
-    if match:
-        return match.group(1)[::-1], match.group(2)[::-1].replace(',', '.')
-    match = re.search(r'([a-zA-Z]+)\s*([\d,\.]+)\s*x', reversed_name, re.IGNORECASE)
-    if match:
-        return match.group(1)[::-1], match.group(2)[::-1].replace(',', '.')
-    return None, None
+def extract_birim_miktar(names: pd.Series) -> pd.DataFrame:
+    matches = names.str.extract(BIRIM_MIKTAR_PATTERN)
+    return pd.DataFrame({
+        'Birim': matches[1],
+        'Miktar': matches[0].str.replace(',', '.', regex=False),
+    }, index=names.index)
 
 # Function to process JSON content and extract sections
-def process_json_content(json_content, section_names):
+def process_json_content(json_content, section_lookup):
     # Initialize all sections with default value
-    sections = {name: "-" for name in section_names}
-    
+    sections = {name: "-" for name in SECTION_NAMES}
+
+    if not isinstance(json_content, list):
+        return sections
     for item in json_content:
-        tab_name = item.get("Tab Name", "").strip().lower()
-        content = item.get("Content", "-")
-        
-        # Normalize section names for matching
-        normalized_section_names = [name.strip().lower() for name in section_names]
-        
-        if tab_name in normalized_section_names:
-            matched_section = section_names[normalized_section_names.index(tab_name)]
-            sections[matched_section] = content
-    
+        if not isinstance(item, dict):
+            continue
+        tab_name = str(item.get("Tab Name", "")).strip().lower()
+        if tab_name in section_lookup:
+            sections[section_lookup[tab_name]] = item.get("Content", "-")
+
     return sections
 
-# Apply the functions to the 'Ürün Adı' column to create 'Adet', 'Birim', and 'Miktar'
-df['Adet'] = df['Ürün Adı'].apply(lambda x: extract_adet(x) if extract_adet(x) is not None else '1')
-df['Birim'], df['Miktar'] = zip(*df['Ürün Adı'].apply(extract_birim_miktar))
+def build_section_lookup(section_names=SECTION_NAMES):
+    # Normalize section names once; the first name wins if two normalize the same
+    section_lookup = {}
+    for name in section_names:
+        section_lookup.setdefault(name.strip().lower(), name)
+    return section_lookup
 
-# Function to validate JSON
-def is_valid_json(string):
+def parse_sections(raw, section_lookup):
     try:
-        json.loads(string)
-        return True
-    except json.JSONDecodeError:
-        return False
-
-# Process JSON content in 'Açıklama'
-if 'Açıklamalar' in df.columns:
-    keywords = ["Saklama Koşulları", "İçindekiler", "Besin Değerleri", "Alerjen Uyarısı", "Kullanım Önerisi", "Ürün Bilgileri", "İade Koşulları"]
-    
-    def safe_process_json_content(x):
-        if x and is_valid_json(x):
-            return process_json_content(json.loads(x), keywords)
-        return {name: "-" for name in keywords}
-    
-    # Apply processing with debugging
-    sections_df = df['Açıklamalar'].apply(safe_process_json_content)
-    sections_df = pd.DataFrame(sections_df.tolist(), index=df.index)
-    
-    # Merge results
-    df = pd.concat([df, sections_df], axis=1)
-    df.drop(columns=['Açıklamalar'], inplace=True)
-    df.drop(columns=['Açıklama'], inplace=True)
-else:
-    print("Column 'Açıklamalar' not found or empty.")
-
-# Reorder columns to place 'Adet', 'Birim', and 'Miktar' next to 'Ürün Adı'
-columns = list(df.columns)
-urun_adi_index = columns.index('Ürün Adı')
-new_columns_order = columns[:urun_adi_index + 1] + ['Adet', 'Birim', 'Miktar'] + [col for col in columns[urun_adi_index + 1:] if col not in ['Adet', 'Birim', 'Miktar']]
-df = df[new_columns_order]
-
-# Remove duplicated rows
-df = df.drop_duplicates()
-
-# Save the updated dataframe to a new CSV file
-output_file = input_file.replace('.csv', '_updated.csv')
-df.to_csv(output_file, index=False, encoding='utf-8-sig')
-
-print(f"Results saved to {output_file}")
\ No newline at end of file
+        json_content = json.loads(raw) if raw else None
+    except (json.JSONDecodeError, TypeError):
+        json_content = None
+    return process_json_content(json_content, section_lookup)
+
+def split_sections(descriptions: pd.Series, section_names=SECTION_NAMES) -> pd.DataFrame:
+    section_lookup = build_section_lookup(section_names)
+
+    # Identical description blobs are common, so each distinct one is parsed once
+    codes, uniques = pd.factorize(descriptions.fillna(''))
+    parsed = [parse_sections(raw, section_lookup) for raw in uniques]
+    sections_df = pd.DataFrame(parsed, columns=list(section_names))
+    if not len(descriptions):
+        return sections_df.set_axis(descriptions.index)
+    return sections_df.take(codes).set_axis(descriptions.index)
+
+def transform(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+
+    # Ensure 'Açıklama' column exists
+    if 'Açıklama' not in df.columns:
+        df['Açıklama'] = ""
+
+    # Fill NaN values with empty strings in the 'Açıklama' column
+    df['Açıklama'] = df['Açıklama'].fillna('')
+
+    # Create 'Adet', 'Birim', and 'Miktar' from 'Ürün Adı'. Daily files repeat the same
+    # products, so the patterns run once per distinct name and are broadcast back.
+    codes, unique_names = pd.factorize(df['Ürün Adı'].astype('string'))
+    unique_names = pd.Series(unique_names, dtype='string')
+    quantities = extract_birim_miktar(unique_names)
+    quantities['Adet'] = extract_adet(unique_names)
+    # Rows without a name (code -1) get the same values a missing name produces
+    quantities.loc[len(quantities)] = {'Adet': '1', 'Birim': pd.NA, 'Miktar': pd.NA}
+    quantities = quantities.take(codes).set_axis(df.index)
+    df['Adet'] = quantities['Adet']
+    df['Birim'] = quantities['Birim']
+    df['Miktar'] = quantities['Miktar']
+
+    # Process JSON content in 'Açıklamalar'
+    if 'Açıklamalar' in df.columns:
+        sections_df = split_sections(df['Açıklamalar'])
+
+        # Merge results
+        df = pd.concat([df, sections_df], axis=1)
+        df.drop(columns=['Açıklamalar'], inplace=True)
+        df.drop(columns=['Açıklama'], inplace=True)
+    else:
+        print("Column 'Açıklamalar' not found or empty.")
+
+    # Reorder columns to place 'Adet', 'Birim', and 'Miktar' next to 'Ürün Adı'
+    columns = list(df.columns)
+    urun_adi_index = columns.index('Ürün Adı')
+    new_columns_order = columns[:urun_adi_index + 1] + ['Adet', 'Birim', 'Miktar'] + [col for col in columns[urun_adi_index + 1:] if col not in ['Adet', 'Birim', 'Miktar']]
+    df = df[new_columns_order]
+
+    # Remove duplicated rows
+    return df.drop_duplicates()
+
+def transform_row(row, section_lookup=None):
+    """Row-at-a-time equivalent of ``transform`` for the scraper's result stream.
+
+    Deduplication is left to the caller, which already sees every row.
+    """
+    section_lookup = section_lookup or build_section_lookup()
+    product_name = row.get('Ürün Adı')
+    adet, birim, miktar = '1', None, None
+    if isinstance(product_name, str):
+        match = ADET_PATTERN.search(product_name) or ADET_MULTIPLIER_PATTERN.search(product_name)
+        if match:
+            adet = match.group(1)[::-1]
+        match = BIRIM_MIKTAR_PATTERN.search(product_name)
+        if match:
+            birim, miktar = match.group(2), match.group(1).replace(',', '.')
+
+    # Same column order as transform: quantities right after 'Ürün Adı', sections last
+    updated = {}
+    for column, value in row.items():
+        if column in ('Açıklamalar', 'Açıklama'):
+            continue
+        updated[column] = value
+        if column == 'Ürün Adı':
+            updated.update({'Adet': adet, 'Birim': birim, 'Miktar': miktar})
+    if 'Açıklamalar' in row:
+        updated.update(parse_sections(row['Açıklamalar'], section_lookup))
+    else:
+        updated['Açıklama'] = row.get('Açıklama') or ''
+    return updated
+
+def main(argv):
+    # Get the file name from the command-line arguments
+    if len(argv) < 1:
+        print("Usage: python text_splitter.py <input_file>")
+        sys.exit(1)
+
+    input_file = argv[0]
+
+    # Load the data from the CSV file; scraper output starts with a BOM
+    df = pd.read_csv(input_file, encoding='utf-8-sig')
+
+    df = transform(df)
+
+    # Save the updated dataframe to a new CSV file
+    output_file = input_file.replace('.csv', '_updated.csv')
+    df.to_csv(output_file, index=False, encoding='utf-8-sig')
+
+    print(f"Results saved to {output_file}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,49 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class WaitProfiler:
+    """Accumulates wall-clock time per phase (e.g. ``wait`` vs ``extract``) for a run.
+
+    Phases may nest; time spent in an inner phase is charged to it and not to the
+    enclosing one, so the totals add up to the measured wall-clock time. Safe to
+    share between the listing driver and the worker pool threads.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _add(self, phase: str, seconds: float, calls: int) -> None:
+        with self._lock:
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+            self.counts[phase] = self.counts.get(phase, 0) + calls
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        stack = self._local.__dict__.setdefault('stack', [])
+        now = time.perf_counter()
+        if stack:
+            # Pause the enclosing phase while this one runs
+            self._add(stack[-1][0], now - stack[-1][1], 0)
+        stack.append([phase, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, started = stack.pop()
+            self._add(phase, now - started, 1)
+            if stack:
+                stack[-1][1] = now
+
+    def summary(self) -> str:
+        total = sum(self.seconds.values())
+        lines = ["Time per phase:"]
+        for phase, seconds in sorted(self.seconds.items(), key=lambda item: -item[1]):
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"  {phase:<10} {seconds:8.1f}s  {share:5.1f}%  ({self.counts[phase]} calls)")
+        return "\n".join(lines)